@@ -3,7 +3,7 @@
 import asyncio
 from itertools import count
 from collections import defaultdict
-from typing import Callable, Any, Dict, List, Coroutine, Optional
+from typing import Callable, Any, Dict, List, Coroutine, Mapping, Optional
 from utils.config_loader import ConfigLoader # Added import
 
 class EventDispatcher:
@@ -17,9 +17,8 @@ class EventDispatcher:
         # A dictionary mapping event_type (str) to a list of listeners (Callable)
         self._listeners: Dict[str, List[Callable[..., Any]]] = defaultdict(list)
         
-        # Load event priorities from config
-        system_config = config_loader.get_config("system_config.json")
-        self._event_priorities: Dict[str, int] = system_config.get("event_priorities", {})
+        # Load event priorities from config (a read-only, pre-built table)
+        self._event_priorities: Mapping[str, int] = config_loader.get_event_priorities()
         self._default_priority: int = self._event_priorities.get("DEFAULT", 50)
         
         # The priority queue for events
@@ -20,7 +20,7 @@ class HotkeyManager:
         self.config: ConfigLoader = self.locator.resolve("config_loader")
         self.logger = logging.getLogger(self.__class__.__name__)
         
-        self.hotkeys_config = self.config.get("system_config.json", "hotkeys", {})
+        self.hotkeys_config = self.config.get_hotkeys()
         self.listener = None
 
     def on_open_chat(self):
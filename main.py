@@ -25,7 +25,7 @@ from utils.error_reporter import get_reporter, BaseErrorReporter
 from core.memory_manager import MemoryManager
 
 from utils.config_loader import ConfigLoader
-from utils.logger import setup_logging
+from utils.logger import setup_logging, stop_logging, set_analytics_loop
 
 # Import the new UI and input classes (we'll create these next)
 from ui.tray_manager import TrayManager
@@ -141,6 +141,7 @@ class PersonalAIAgentApp(ctk.CTk):
         """Runs the main asyncio event loop in a separate thread."""
         self.async_loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.async_loop)
+        set_analytics_loop(self.async_loop)
         
         # Run the async_main coroutine
         self.async_loop.run_until_complete(self.async_main())
@@ -290,6 +291,14 @@ if __name__ == "__main__":
     app.mainloop()
     
     logging.info("Application shutting down.")
+    # Error reports are batched in memory; write out any still pending.
+    if app.async_loop and app.async_loop.is_running():
+        try:
+            reporter: BaseErrorReporter = locator.resolve("error_reporter")
+            asyncio.run_coroutine_threadsafe(reporter.close(), app.async_loop).result(timeout=5)
+        except Exception as e:
+            logging.warning(f"Failed to flush pending error reports: {e}")
+    stop_logging()
     args = ["uv", "run", "main.py"]
     # --- MODIFIED: Robust Restart Logic ---
     if app._restart_requested:
@@ -2,8 +2,9 @@
 
 import pytest
 import json
+import os
 from pathlib import Path
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 
 from utils.config_loader import ConfigLoader
 from core.exceptions import ConfigurationError
@@ -72,9 +73,7 @@ def test_load_config_handles_json_decode_error(config_loader, temp_config_dir):
 
 def test_save_config_raises_configuration_error_on_io_error(config_loader):
     """Tests that save_config raises ConfigurationError on file write failure."""
-    with patch("builtins.open", mock_open()) as mocked_file:
-        mocked_file.side_effect = IOError("Disk full")
-        
+    with patch.object(Path, "write_bytes", side_effect=IOError("Disk full")):
         with pytest.raises(ConfigurationError):
             config_loader.save_config("any_file.json", {"data": "any"})
 
@@ -103,3 +102,227 @@ def test_load_all_configs_includes_memory_config_defaults(config_loader, temp_co
     assert (temp_config_dir / "memory_config.json").exists()
     assert (temp_config_dir / "commands_config.json").exists()
     assert (temp_config_dir / "context_config.json").exists()
+
+def test_save_many_writes_all_files(config_loader, temp_config_dir):
+    """Tests that save_many persists and caches every file it is given."""
+    updates = {
+        "first.json": {"a": 1},
+        "second.json": {"b": [1, 2]},
+    }
+
+    config_loader.save_many(updates)
+
+    for filename, data in updates.items():
+        with open(temp_config_dir / filename, 'r') as f:
+            assert json.load(f) == data
+        assert config_loader.get_config(filename) == data
+
+def test_get_config_loads_and_caches_unloaded_file(config_loader, temp_config_dir):
+    """Tests that a config created after startup is read once, then served from cache."""
+    config_loader.load_all_configs()
+    with open(temp_config_dir / "late_config.json", 'w') as f:
+        json.dump({"late": True}, f)
+
+    assert config_loader.get_config("late_config.json") == {"late": True}
+
+    with patch.object(Path, "read_bytes") as mocked_read:
+        assert config_loader.get_config("late_config.json") == {"late": True}
+        mocked_read.assert_not_called()
+
+def test_save_config_skips_unchanged_data(config_loader, temp_config_dir):
+    """Tests that saving data identical to what was last written doesn't rewrite the file."""
+    config_loader.save_config("same.json", {"a": 1})
+
+    with patch.object(Path, "write_bytes") as mocked_write:
+        config_loader.save_config("same.json", {"a": 1})
+        mocked_write.assert_not_called()
+
+    config_loader.save_config("same.json", {"a": 2})
+    with open(temp_config_dir / "same.json", 'r') as f:
+        assert json.load(f) == {"a": 2}
+
+def test_reload_if_changed_rereads_file_edited_on_disk(config_loader, temp_config_dir):
+    """Tests that get_config keeps serving the cache and reload_if_changed picks up an outside edit."""
+    config_loader.load_all_configs()
+    cached = config_loader.get_config("ui_config.json")
+    assert not config_loader.reload_if_changed("ui_config.json")
+    file_path = temp_config_dir / "ui_config.json"
+    with open(file_path, 'w') as f:
+        json.dump({"theme": "dark"}, f)
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert config_loader.get_config("ui_config.json") is cached
+    assert config_loader.reload_if_changed("ui_config.json")
+    assert config_loader.get_config("ui_config.json") == {"theme": "dark"}
+
+def test_save_config_replaces_file_atomically(config_loader, temp_config_dir):
+    """Tests that saves go through a temp file that is renamed into place."""
+    with patch("os.replace", wraps=os.replace) as mocked_replace:
+        config_loader.save_config("atomic.json", {"a": 1})
+
+    mocked_replace.assert_called_once_with(temp_config_dir / "atomic.json.tmp", temp_config_dir / "atomic.json")
+    assert not (temp_config_dir / "atomic.json.tmp").exists()
+    with open(temp_config_dir / "atomic.json", 'r') as f:
+        assert json.load(f) == {"a": 1}
+
+def test_save_and_load_round_trip_without_orjson(config_loader, temp_config_dir):
+    """Tests that the stdlib json fallback reads and writes configs when orjson is absent."""
+    with patch("utils.json_io.orjson", None):
+        config_loader.save_config("fallback.json", {"name": "café", "items": [1, 2]})
+        assert config_loader._load_config("fallback.json", {}) == {"name": "café", "items": [1, 2]}
+
+def test_save_config_matches_stdlib_json_layout(config_loader, temp_config_dir):
+    """Tests that configs are written byte-for-byte as json.dumps(data, indent=4) would."""
+    data = {"name": "café", "items": [1, 2]}
+    config_loader.save_config("layout.json", data)
+    assert (temp_config_dir / "layout.json").read_text() == json.dumps(data, indent=4)
+
+def test_snapshot_exposes_the_cached_configs(config_loader):
+    """Tests that snapshot() returns the same live dicts get_config() serves."""
+    config_loader.load_all_configs()
+    cfg = config_loader.snapshot()
+
+    assert cfg.ui is config_loader.get_config("ui_config.json")
+    assert cfg.models is config_loader.get_config("models_config.json")
+    assert cfg.system is config_loader.get_config("system_config.json")
+
+def test_load_all_configs_skips_parsing_unchanged_files(config_loader):
+    """Tests that reloading reuses parsed data for files whose mtime and size are unchanged."""
+    config_loader.load_all_configs()
+    first = config_loader.get_config("system_config.json")
+
+    with patch.object(Path, "read_bytes") as mocked_read:
+        config_loader.load_all_configs()
+        mocked_read.assert_not_called()
+
+    assert config_loader.get_config("system_config.json") is first
+
+def test_load_all_configs_defers_parsing_existing_files(config_loader, temp_config_dir):
+    """Tests that existing configs are parsed on first get_config(), not at startup."""
+    with open(temp_config_dir / "ui_config.json", 'w') as f:
+        json.dump({"theme": "dark"}, f)
+
+    with patch.object(Path, "read_bytes", autospec=True, side_effect=Path.read_bytes) as mocked_read:
+        config_loader.load_all_configs()
+        mocked_read.assert_not_called()
+
+        assert config_loader.get_config("ui_config.json") == {"theme": "dark"}
+        mocked_read.assert_called_once()
+
+def test_created_defaults_are_private_to_each_loader(tmp_path):
+    """Tests that mutating a freshly created default config doesn't leak into the shared defaults."""
+    first = ConfigLoader(tmp_path / "first")
+    first.load_all_configs()
+    first.get_config("ui_config.json")["theme"] = "dark"
+
+    second = ConfigLoader(tmp_path / "second")
+    second.load_all_configs()
+    assert second.get_config("ui_config.json") == {"theme": "system"}
+
+def test_failed_save_keeps_original_and_removes_temp_file(config_loader, temp_config_dir):
+    """Tests that a write failing before the rename leaves the old file intact and no temp file."""
+    config_loader.save_config("keep.json", {"a": 1})
+
+    with patch("os.replace", side_effect=OSError("rename failed")):
+        with pytest.raises(ConfigurationError):
+            config_loader.save_config("keep.json", {"a": 2})
+
+    assert not (temp_config_dir / "keep.json.tmp").exists()
+    with open(temp_config_dir / "keep.json", 'r') as f:
+        assert json.load(f) == {"a": 1}
+
+def test_event_priorities_are_frozen_and_rebuilt_on_save(config_loader):
+    """Tests that get_event_priorities() is read-only, cached, and refreshed after a save."""
+    config_loader.load_all_configs()
+    priorities = config_loader.get_event_priorities()
+
+    assert priorities["UI_EVENT"] == 10
+    assert config_loader.get_event_priorities() is priorities
+    with pytest.raises(TypeError):
+        priorities["UI_EVENT"] = 1  # type: ignore[index]
+
+    system_config = config_loader.get_config("system_config.json")
+    system_config["event_priorities"]["UI_EVENT"] = 1
+    config_loader.save_config("system_config.json", system_config)
+
+    assert config_loader.get_event_priorities()["UI_EVENT"] == 1
+
+def test_iter_all_models_flattens_providers_and_rebuilds_on_save(config_loader):
+    """Tests that iter_all_models() lists every provider's models and tracks saves."""
+    config_loader.load_all_configs()
+    assert list(config_loader.iter_all_models()) == [("gemini", "gemini-1.5-flash-latest")]
+
+    models_config = config_loader.get_config("models_config.json")
+    models_config["providers"]["ollama"]["models"] = ["llama3"]
+    config_loader.save_config("models_config.json", models_config)
+
+    assert list(config_loader.iter_all_models()) == [
+        ("gemini", "gemini-1.5-flash-latest"),
+        ("ollama", "llama3"),
+    ]
+
+def test_load_fills_in_missing_default_keys(config_loader, temp_config_dir):
+    """Tests that keys missing from an existing config are merged in from defaults and persisted."""
+    with open(temp_config_dir / "system_config.json", 'w') as f:
+        json.dump({"hotkeys": {"open_chat": "<ctrl>+k"}}, f)
+
+    system_config = config_loader.get_config("system_config.json")
+
+    assert system_config["hotkeys"] == {"open_chat": "<ctrl>+k", "screen_capture": "<ctrl>+<shift>+x"}
+    assert system_config["event_priorities"]["DEFAULT"] == 50
+    with open(temp_config_dir / "system_config.json", 'r') as f:
+        assert json.load(f) == system_config
+
+def test_load_does_not_rewrite_complete_config(config_loader, temp_config_dir):
+    """Tests that a config already holding every default key is not written back."""
+    with open(temp_config_dir / "ui_config.json", 'w') as f:
+        json.dump({"theme": "dark", "extra": 1}, f)
+
+    with patch.object(Path, "write_bytes") as mocked_write:
+        assert config_loader.get_config("ui_config.json") == {"theme": "dark", "extra": 1}
+        mocked_write.assert_not_called()
+
+def test_has_changed_on_disk_ignores_own_saves(config_loader, temp_config_dir):
+    """Tests that only edits made outside the loader count as changes on disk."""
+    config_loader.load_all_configs()
+    ui_config = config_loader.get_config("ui_config.json")
+    ui_config["theme"] = "light"
+    config_loader.save_config("ui_config.json", ui_config)
+    assert not config_loader.has_changed_on_disk("ui_config.json")
+
+    file_path = temp_config_dir / "ui_config.json"
+    with open(file_path, 'w') as f:
+        json.dump({"theme": "dark"}, f)
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert config_loader.has_changed_on_disk("ui_config.json")
+
+def test_get_config_of_unknown_missing_file_is_not_created(config_loader, temp_config_dir):
+    """Tests that a non-default config that doesn't exist returns empty without creating the file."""
+    assert config_loader.get_config("unknown.json") == {}
+    assert not (temp_config_dir / "unknown.json").exists()
+
+def test_save_config_rewrites_deleted_file(config_loader, temp_config_dir):
+    """Tests that saving unchanged data still writes the file if it was deleted."""
+    config_loader.save_config("gone.json", {"a": 1})
+    (temp_config_dir / "gone.json").unlink()
+
+    config_loader.save_config("gone.json", {"a": 1})
+
+    with open(temp_config_dir / "gone.json", 'r') as f:
+        assert json.load(f) == {"a": 1}
+
+def test_update_in_background_applies_updates_in_order_to_cached_dict(config_loader, temp_config_dir):
+    """Tests that background updates keep call order and edit the cached dict in place."""
+    config_loader.load_all_configs()
+    ui_config = config_loader.get_config("ui_config.json")
+
+    config_loader.update_in_background("ui_config.json", "popup_window", "geometry", "100x100+0+0")
+    config_loader.update_in_background("ui_config.json", "popup_window", "geometry", "200x200+0+0").result()
+
+    assert config_loader.get_config("ui_config.json") is ui_config
+    assert ui_config["popup_window"]["geometry"] == "200x200+0+0"
+    assert not config_loader.has_changed_on_disk("ui_config.json")
+    with open(temp_config_dir / "ui_config.json", 'r') as f:
+        assert json.load(f)["popup_window"]["geometry"] == "200x200+0+0"
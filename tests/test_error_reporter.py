@@ -0,0 +1,128 @@
+# file: tests/test_error_reporter.py
+
+import asyncio
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from utils.error_reporter import JsonFileErrorReporter
+
+@pytest.mark.asyncio
+async def test_report_issue_batches_reports_until_flush(tmp_path):
+    """Tests that reports are held in memory and merged into one write on flush."""
+    reporter = JsonFileErrorReporter(tmp_path, flush_interval=60)
+
+    await reporter.report_issue("abc", {"count_in_timespan": 3, "message": "first"})
+    await reporter.report_issue("abc", {"count_in_timespan": 2, "message": "second"})
+    assert not (tmp_path / "ab" / "abc.json").exists()
+
+    await reporter.close()
+
+    with open(tmp_path / "ab" / "abc.json", 'r') as f:
+        report = json.load(f)
+    assert report["pattern_hash"] == "abc"
+    assert report["total_occurrences"] == 5
+    assert report["last_report_details"]["message"] == "second"
+
+@pytest.mark.asyncio
+async def test_flush_merges_into_existing_report(tmp_path):
+    """Tests that a flush adds to the totals already on disk."""
+    reporter = JsonFileErrorReporter(tmp_path, flush_interval=60)
+
+    await reporter.report_issue("abc", {"count_in_timespan": 1})
+    await reporter.flush()
+    with open(tmp_path / "ab" / "abc.json", 'r') as f:
+        first_reported = json.load(f)["first_reported_utc"]
+
+    await reporter.report_issue("abc", {"count_in_timespan": 4})
+    await reporter.close()
+
+    with open(tmp_path / "ab" / "abc.json", 'r') as f:
+        report = json.load(f)
+    assert report["total_occurrences"] == 5
+    assert report["first_reported_utc"] == first_reported
+
+@pytest.mark.asyncio
+async def test_flush_reads_each_report_file_once(tmp_path):
+    """Tests that repeat flushes for a pattern reuse the cached report instead of re-reading it."""
+    (tmp_path / "ab").mkdir()
+    (tmp_path / "ab" / "abc.json").write_text(json.dumps({"pattern_hash": "abc", "total_occurrences": 10}))
+    reporter = JsonFileErrorReporter(tmp_path, flush_interval=60)
+
+    with patch.object(Path, "read_bytes", autospec=True, side_effect=Path.read_bytes) as mocked_read:
+        for _ in range(3):
+            await reporter.report_issue("abc", {"count_in_timespan": 1})
+            await reporter.flush()
+        mocked_read.assert_called_once()
+
+    with open(tmp_path / "ab" / "abc.json", 'r') as f:
+        assert json.load(f)["total_occurrences"] == 13
+
+@pytest.mark.asyncio
+async def test_flush_moves_legacy_flat_report_into_shard(tmp_path):
+    """Tests that a report from the old flat layout keeps its history and is moved into its shard."""
+    (tmp_path / "abc.json").write_text(json.dumps({
+        "pattern_hash": "abc", "first_reported_utc": "2024-01-01T00:00:00", "total_occurrences": 7,
+    }))
+    reporter = JsonFileErrorReporter(tmp_path, flush_interval=60)
+
+    await reporter.report_issue("abc", {"count_in_timespan": 1})
+    await reporter.close()
+
+    assert not (tmp_path / "abc.json").exists()
+    with open(tmp_path / "ab" / "abc.json", 'r') as f:
+        report = json.load(f)
+    assert report["total_occurrences"] == 8
+    assert report["first_reported_utc"] == "2024-01-01T00:00:00"
+
+@pytest.mark.asyncio
+async def test_report_during_timer_flush_gets_its_own_flush(tmp_path):
+    """Tests that a report arriving while the timer's flush is writing is flushed afterwards."""
+    reporter = JsonFileErrorReporter(tmp_path, flush_interval=0.01)
+    write_started, release_write = asyncio.Event(), asyncio.Event()
+    original_write = reporter._write_report
+
+    async def slow_write(pattern_hash, update):
+        if pattern_hash == "abc":
+            write_started.set()
+            await release_write.wait()
+        await original_write(pattern_hash, update)
+
+    with patch.object(reporter, "_write_report", side_effect=slow_write):
+        await reporter.report_issue("abc", {"count_in_timespan": 1})
+        await asyncio.wait_for(write_started.wait(), timeout=5)
+        await reporter.report_issue("def", {"count_in_timespan": 1})
+        release_write.set()
+
+        for _ in range(100):
+            if (tmp_path / "de" / "def.json").exists():
+                break
+            await asyncio.sleep(0.01)
+
+    assert (tmp_path / "de" / "def.json").exists()
+    assert reporter._pending == {}
+
+@pytest.mark.asyncio
+async def test_flush_writes_remaining_reports_after_one_fails(tmp_path):
+    """Tests that a report that fails to serialize doesn't stop the rest of the batch."""
+    reporter = JsonFileErrorReporter(tmp_path, flush_interval=60)
+
+    await reporter.report_issue("abc", {"count_in_timespan": 1, "bad": object()})
+    await reporter.report_issue("def", {"count_in_timespan": 1})
+    await reporter.close()
+
+    assert not (tmp_path / "ab" / "abc.json").exists()
+    with open(tmp_path / "de" / "def.json", 'r') as f:
+        assert json.load(f)["total_occurrences"] == 1
+
+@pytest.mark.asyncio
+async def test_report_writes_non_ascii_unescaped_without_orjson(tmp_path):
+    """Tests that the stdlib fallback writes reports in the same UTF-8 form as orjson."""
+    reporter = JsonFileErrorReporter(tmp_path, flush_interval=60)
+
+    with patch("utils.json_io.orjson", None):
+        await reporter.report_issue("abc", {"count_in_timespan": 1, "message": "café"})
+        await reporter.close()
+
+    assert "café".encode("utf-8") in (tmp_path / "ab" / "abc.json").read_bytes()
@@ -2,6 +2,7 @@ from unittest.mock import MagicMock, AsyncMock
 import pytest
 import pytest_asyncio
 import asyncio
+from types import MappingProxyType
 from core.event_dispatcher import EventDispatcher
 
 # ... (rest of the imports)
@@ -10,17 +11,15 @@ from core.event_dispatcher import EventDispatcher
 async def dispatcher(mock_service_locator):
     """Returns a new EventDispatcher instance for each test."""
     # Configure the mock config loader for EventDispatcher
-    mock_service_locator.mock_config_loader.get_config.return_value = {
-        "event_priorities": {
-            "DEFAULT": 50,
-            "ERROR_EVENT": 0,
-            "SYSTEM_EVENT": 5,
-            "UI_EVENT": 10,
-            "USER_ACTION": 10,
-            "MODEL_RESPONSE": 20,
-            "LOGGING_EVENT": 100
-        }
-    }
+    mock_service_locator.mock_config_loader.get_event_priorities.return_value = MappingProxyType({
+        "DEFAULT": 50,
+        "ERROR_EVENT": 0,
+        "SYSTEM_EVENT": 5,
+        "UI_EVENT": 10,
+        "USER_ACTION": 10,
+        "MODEL_RESPONSE": 20,
+        "LOGGING_EVENT": 100
+    })
     # Start the dispatcher loop in the background for tests
     dispatcher_instance = EventDispatcher(mock_service_locator.mock_config_loader)
     await dispatcher_instance.start()
@@ -0,0 +1,18 @@
+# file: tests/test_json_io.py
+
+import json
+from unittest.mock import patch
+
+from utils import json_io
+
+def test_stdlib_fallback_writes_non_ascii_unescaped():
+    """Tests that the stdlib fallback writes non-ASCII text the same way orjson does."""
+    with patch("utils.json_io.orjson", None):
+        raw = json_io.dumps({"name": "café"}, indent=4)
+        assert "café".encode("utf-8") in raw
+        assert json_io.loads(raw) == {"name": "café"}
+
+def test_ensure_ascii_escapes_non_ascii():
+    """Tests that ensure_ascii=True matches json.dumps' default escaping."""
+    raw = json_io.dumps({"name": "café"}, indent=4, ensure_ascii=True)
+    assert raw == json.dumps({"name": "café"}, indent=4).encode("ascii")
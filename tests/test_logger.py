@@ -1,9 +1,13 @@
 # file: tests/test_logger.py
 
+import asyncio
 import logging
+import threading
 import pytest
-from unittest.mock import MagicMock, patch
-from utils.logger import setup_logging, MemoryLogFilter
+from logging.handlers import QueueHandler
+from unittest.mock import AsyncMock, MagicMock, patch
+import utils.logger as logger_module
+from utils.logger import _add_memory_filter, setup_logging, stop_logging, reset_logging, AnalyticsLogHandler, MemoryLogFilter
 from pathlib import Path
 
 # Mock the ConfigLoader for setup_logging
@@ -21,11 +25,14 @@ def mock_config_loader(tmp_path: Path):
 @pytest.fixture(autouse=True)
 def reset_logging_handlers():
     root_logger = logging.getLogger()
+    # Forget handlers installed by earlier setup_logging() calls
+    reset_logging()
     # Store original handlers
     original_handlers = root_logger.handlers[:]
     # Clear handlers before test
     root_logger.handlers = []
     yield
+    reset_logging()
     # Restore original handlers after test
     root_logger.handlers = original_handlers
 
@@ -44,6 +51,23 @@ def test_memory_log_filter_injects_memory_info():
         # The global mock in conftest.py returns 100MB
         assert record.mem_rss_mb == 100.0  # type: ignore[attr-defined]
 
+def test_memory_log_filter_samples_memory_once_per_ttl():
+    """Test that records within the TTL reuse the cached RSS instead of querying psutil."""
+    log_filter = MemoryLogFilter()
+    new_record = lambda: logging.LogRecord("name", logging.INFO, "file", 1, "msg", (), None)
+
+    with patch.object(log_filter.process, "memory_info", wraps=log_filter.process.memory_info) as mocked_info:
+        for _ in range(5):
+            log_filter.filter(new_record())
+        assert mocked_info.call_count == 1
+
+        log_filter._cache_expires_at = 0.0
+        record = new_record()
+        log_filter.filter(record)
+        assert mocked_info.call_count == 2
+
+    assert record.mem_rss_mb == 100.0  # type: ignore[attr-defined]
+
 def test_setup_logging_configures_memory_filter_and_format(mock_config_loader, caplog):
     """Test that setup_logging correctly applies the MemoryLogFilter and format."""
     caplog.set_level(logging.DEBUG)
@@ -52,9 +76,12 @@ def test_setup_logging_configures_memory_filter_and_format(mock_config_loader, c
 
     root_logger = logging.getLogger()
     
+    # The file handler sits behind the queue listener; the queue handler
+    # formats records (and so carries the filter) before they are queued.
+    assert [h.get_name() for h in logger_module._listener.handlers] == ["app_file_handler"]
     app_handlers = [
-        h for h in root_logger.handlers 
-        if h.get_name() in ["app_console_handler", "app_file_handler"]
+        h for h in root_logger.handlers
+        if h.get_name() in ["app_console_handler", "app_queue_handler"]
     ]
     
     assert len(app_handlers) == 2, f"Expected 2 app handlers, found {len(app_handlers)}"
@@ -78,3 +105,112 @@ def test_setup_logging_configures_memory_filter_and_format(mock_config_loader, c
     
     assert "[100.0MB]" in caplog.text
     assert "This is a test log message." in caplog.text
+
+def test_stop_logging_flushes_queued_records_to_file(mock_config_loader, tmp_path):
+    """Test that records queued for the listener are in the log file after stop_logging()."""
+    setup_logging(mock_config_loader)
+    logging.getLogger("test_logger").info("Queued message.")
+
+    stop_logging()
+
+    log_text = (tmp_path / "logs" / "agent.log").read_text(encoding="utf-8")
+    assert "Queued message." in log_text
+    assert not any(isinstance(h, QueueHandler) for h in logging.getLogger().handlers)
+
+def test_exception_traceback_follows_the_formatted_line_in_file(mock_config_loader, tmp_path):
+    """Test that a logged exception keeps the file's line format, with the traceback after it."""
+    setup_logging(mock_config_loader)
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logging.getLogger("test_logger").exception("boom happened")
+
+    stop_logging()
+
+    lines = (tmp_path / "logs" / "agent.log").read_text(encoding="utf-8").splitlines()
+    index = next(i for i, line in enumerate(lines) if "boom happened" in line)
+    assert "ERROR - [100.0MB] - boom happened (test_logger.py:" in lines[index]
+    assert lines[index + 1] == "Traceback (most recent call last):"
+    assert lines[-1] == "ZeroDivisionError: division by zero"
+
+def test_stop_logging_keeps_the_file_format(mock_config_loader, tmp_path):
+    """Test that records logged after stop_logging() are still written in the app format."""
+    setup_logging(mock_config_loader)
+    stop_logging()
+
+    logging.getLogger("test_logger").info("After stop.")
+
+    log_text = (tmp_path / "logs" / "agent.log").read_text(encoding="utf-8")
+    assert "INFO - [100.0MB] - After stop. (test_logger.py:" in log_text
+
+def test_setup_logging_after_stop_does_not_duplicate_file_handler(mock_config_loader, tmp_path):
+    """Test that setup_logging() after stop_logging() doesn't write every line twice."""
+    setup_logging(mock_config_loader)
+    stop_logging()
+
+    setup_logging(mock_config_loader)
+    logging.getLogger("test_logger").info("Written once.")
+
+    file_handlers = [h for h in logging.getLogger().handlers if h.get_name() == "app_file_handler"]
+    assert len(file_handlers) == 1
+    log_text = (tmp_path / "logs" / "agent.log").read_text(encoding="utf-8")
+    assert log_text.count("Written once.") == 1
+
+def test_analytics_handler_submits_from_another_thread():
+    """Test that an error logged off the loop thread is analyzed on the captured loop."""
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
+    analytics = MagicMock()
+    analytics.analyze_error = AsyncMock()
+    handler = AnalyticsLogHandler(analytics, loop=loop)
+
+    try:
+        error = ValueError("boom")
+        record = logging.LogRecord("name", logging.ERROR, "file", 1, "failed", (), (ValueError, error, None))
+        handler.emit(record)
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(timeout=5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join(timeout=5)
+        loop.close()
+
+    analytics.analyze_error.assert_awaited_once()
+    assert analytics.analyze_error.await_args.args[0] is error
+
+def test_setup_logging_installs_handlers_once(mock_config_loader):
+    """Test that repeated setup_logging() calls don't stack duplicate handlers."""
+    setup_logging(mock_config_loader)
+    handler_count = len(logging.getLogger().handlers)
+
+    setup_logging(mock_config_loader)
+
+    assert len(logging.getLogger().handlers) == handler_count
+
+def test_memory_filter_only_added_where_format_uses_it():
+    """Test that the memory filter is skipped for handlers whose format doesn't print RSS."""
+    memory_filter = MemoryLogFilter()
+    with_rss = logging.StreamHandler()
+    without_rss = logging.StreamHandler()
+
+    _add_memory_filter(with_rss, memory_filter, "[%(mem_rss_mb)4.1fMB] %(message)s")
+    _add_memory_filter(without_rss, memory_filter, "%(message)s")
+
+    assert memory_filter in with_rss.filters
+    assert memory_filter not in without_rss.filters
+
+def test_analytics_handler_survives_failed_submit():
+    """Test that a submit failing mid-shutdown neither raises from emit nor leaks a pending slot."""
+    loop = MagicMock()
+    loop.is_closed.return_value = False
+    analytics = MagicMock()
+    analytics.analyze_error = AsyncMock()
+    handler = AnalyticsLogHandler(analytics, loop=loop)
+    record = logging.LogRecord("name", logging.ERROR, "file", 1, "failed", (), (ValueError, ValueError("boom"), None))
+
+    with patch("utils.logger.asyncio.run_coroutine_threadsafe", side_effect=RuntimeError("loop closed")), \
+            patch.object(handler, "handleError") as mocked_handle_error:
+        for _ in range(AnalyticsLogHandler.MAX_PENDING + 1):
+            handler.emit(record)
+
+    assert mocked_handle_error.call_count == AnalyticsLogHandler.MAX_PENDING + 1
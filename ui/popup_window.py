@@ -89,6 +89,8 @@ class PopupWindow(ctk.CTkToplevel):
         )
         self.geometry(geometry)
         self.last_geometry = geometry
+        # (width, height, x, y) of the last <Configure> event on the window itself
+        self._last_configure = None
         self.attributes("-topmost", True)
         
         # Grid configuration
@@ -594,6 +596,16 @@ class PopupWindow(ctk.CTkToplevel):
     
     def _on_window_move(self, event):
         """Track window geometry changes"""
+        # <Configure> bound on a toplevel also fires for every child widget;
+        # only the window's own events can change its geometry.
+        if event.widget is not self:
+            return
+        # The event already carries size and position; only ask Tk for the
+        # geometry string when one of them actually changed.
+        configure = (event.width, event.height, event.x, event.y)
+        if configure == self._last_configure:
+            return
+        self._last_configure = configure
         self.last_geometry = self.geometry()
     
     def publish_async_event(self, event_type: str, *args, **kwargs):
@@ -642,13 +654,11 @@ class PopupWindow(ctk.CTkToplevel):
 
     def hide(self):
         """Hide the popup window"""
-        # Save geometry
+        # Save geometry off the UI thread so withdraw() doesn't wait on disk
         if self.last_geometry:
-            ui_config = self.config.get_config("ui_config.json")
-            ui_config.setdefault("popup_window", {})["geometry"] = self.last_geometry
-            self.config.save_config("ui_config.json", ui_config)
+            self.config.update_in_background("ui_config.json", "popup_window", "geometry", self.last_geometry)
             self.last_geometry = ""
-        
+
         self.withdraw()
         self.is_visible = False
 
@@ -59,40 +59,21 @@ class ApiKeysTab(ctk.CTkFrame):
         self.openrouter_key_entry.bind("<KeyRelease>", mark_dirty_callback)
         self.ollama_url_entry.bind("<KeyRelease>", mark_dirty_callback)
 
+        self._test_menu_triples = (
+            (self.gemini_model_menu, self.gemini_test_model_var, "gemini"),
+            (self.openrouter_model_menu, self.openrouter_test_model_var, "openrouter"),
+            (self.ollama_model_menu, self.ollama_test_model_var, "ollama"),
+        )
+
     def update_test_model_dropdowns(self, staged_model_lists):
         """Populates the model dropdowns on the API Keys tab."""
-        # --- Gemini ---
-        gemini_models = staged_model_lists.get("gemini", [])
-        self.gemini_model_menu.configure(values=gemini_models)
-        current_gemini = self.gemini_test_model_var.get()
-        if current_gemini in gemini_models:
-            self.gemini_model_menu.set(current_gemini)
-        elif gemini_models:
-            self.gemini_test_model_var.set(gemini_models[0])
-        else:
-            self.gemini_test_model_var.set("")
-            self.gemini_model_menu.set("")
-
-        # --- OpenRouter ---
-        openrouter_models = staged_model_lists.get("openrouter", [])
-        self.openrouter_model_menu.configure(values=openrouter_models)
-        current_openrouter = self.openrouter_test_model_var.get()
-        if current_openrouter in openrouter_models:
-            self.openrouter_model_menu.set(current_openrouter)
-        elif openrouter_models:
-            self.openrouter_test_model_var.set(openrouter_models[0])
-        else:
-            self.openrouter_test_model_var.set("")
-            self.openrouter_model_menu.set("")
-
-        # --- Ollama ---
-        ollama_models = staged_model_lists.get("ollama", [])
-        self.ollama_model_menu.configure(values=ollama_models)
-        current_ollama = self.ollama_test_model_var.get()
-        if current_ollama in ollama_models:
-            self.ollama_model_menu.set(current_ollama)
-        elif ollama_models:
-            self.ollama_test_model_var.set(ollama_models[0])
-        else:
-            self.ollama_test_model_var.set("")
-            self.ollama_model_menu.set("")
+        for menu, var, provider_id in self._test_menu_triples:
+            models = staged_model_lists.get(provider_id, [])
+            menu.configure(values=models)
+            # The menu tracks its variable, so a single set() (only when the
+            # selection actually moves) updates both.
+            current = var.get()
+            if current not in models:
+                fallback = models[0] if models else ""
+                if current != fallback:
+                    var.set(fallback)
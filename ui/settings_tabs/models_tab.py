@@ -1,10 +1,11 @@
 # file: ui/settings_tabs/models_tab.py
+import asyncio
 import customtkinter as ctk
 import tkinter as tk
 
 class ModelsTab(ctk.CTkFrame):
     """Tab for managing AI models."""
-    def __init__(self, master, locator, active_model_var, manage_provider_var, staged_model_lists, mark_dirty_callback, **kwargs):
+    def __init__(self, master, locator, active_model_var, active_provider_var, manage_provider_var, staged_model_lists, mark_dirty_callback, models_changed_callback=None, **kwargs):
         super().__init__(master, fg_color="transparent", **kwargs)
         
         self.locator = locator
@@ -12,9 +13,26 @@ class ModelsTab(ctk.CTkFrame):
         self.events = self.locator.resolve("event_dispatcher")
         
         self.active_model_var = active_model_var
+        self.active_provider_var = active_provider_var
         self.manage_provider_var = manage_provider_var
         self.staged_model_lists = staged_model_lists
         self._mark_dirty = mark_dirty_callback
+        self._models_changed_callback = models_changed_callback
+
+        # Providers whose staged list changed since the last refresh; a burst of
+        # edits is flushed in one idle callback instead of one repaint per edit.
+        self._dirty_providers = set()
+        self._refresh_scheduled = False
+
+        # Values currently configured on the option menus; configure(values=...)
+        # rebuilds CTk's dropdown menu, so it's skipped when nothing changed.
+        self._model_dropdown_values = []
+        self._provider_options = []
+        # provider_id -> ["provider/model", ...]; dropped when that provider's list changes
+        self._formatted_models = {}
+        # Provider and model list the active-model dropdown was last synced to.
+        self._last_active_dropdown_for = None
+        self._last_active_dropdown_models = None
 
         self.grid_columnconfigure(1, weight=1)
 
@@ -25,7 +43,8 @@ class ModelsTab(ctk.CTkFrame):
 
         # --- Row 1 - Active Model ---
         ctk.CTkLabel(self, text="Active Model:").grid(row=1, column=0, padx=10, pady=10, sticky="w")
-        self.model_dropdown = ctk.CTkOptionMenu(self, variable=self.active_model_var, values=[])
+        self.model_dropdown = ctk.CTkOptionMenu(self, variable=self.active_model_var, values=[],
+                                                command=self._on_active_model_selected)
         self.model_dropdown.grid(row=1, column=1, padx=10, pady=10, sticky="ew")
         self.active_model_var.trace_add("write", self._mark_dirty)
 
@@ -37,6 +56,9 @@ class ModelsTab(ctk.CTkFrame):
         self.model_list_frame = ctk.CTkScrollableFrame(self)
         self.model_list_frame.grid(row=4, column=0, columnspan=2, padx=10, pady=0, sticky="nsew")
         self.grid_rowconfigure(4, weight=1)
+        # (frame, label, menu_button) per row; rows are reused across renders
+        # and surplus ones are unpacked rather than destroyed.
+        self._model_rows = []
 
         # --- Row 5 - Add Model Frame ---
         add_frame = ctk.CTkFrame(self)
@@ -50,51 +72,89 @@ class ModelsTab(ctk.CTkFrame):
         self.add_model_button = ctk.CTkButton(add_frame, text="Add Model", width=100, command=self._add_model_to_ui)
         self.add_model_button.grid(row=0, column=1, padx=(5, 0), pady=0)
 
+        # One context menu shared by every row; its commands are rebound per click.
+        self._model_menu = tk.Menu(self, tearoff=0)
+        self._model_menu.add_command(label="Remove")
+        self._model_menu.add_command(label="Set as Default")
+        self._model_menu.add_command(label="Test Model")
+
         self.manage_provider_var.trace_add("write", self._on_manage_provider_changed)
 
+        # The tab may be built after settings were loaded; render the shared state.
+        self.set_provider_options(self.staged_model_lists.keys())
+        self._on_manage_provider_changed()
+
     def _on_manage_provider_changed(self, *args):
         provider_id = self.manage_provider_var.get()
         if provider_id:
             self.update_model_ui(provider_id)
             self.update_active_model_dropdown(provider_id)
 
+    def _on_active_model_selected(self, _choice: str):
+        # The dropdown only ever lists the managed provider's models.
+        self.active_provider_var.set(self.manage_provider_var.get())
+
     def update_active_model_dropdown(self, provider_id: str):
-        self.logger.debug(f"Updating active model dropdown for provider: {provider_id}")
-        
         models_list = self.staged_model_lists.get(provider_id, [])
-        formatted_models = [f"{provider_id}/{model}" for model in models_list]
+        if provider_id == self._last_active_dropdown_for and models_list == self._last_active_dropdown_models:
+            return
+        self.logger.debug(f"Updating active model dropdown for provider: {provider_id}")
         
+        formatted_models = self._formatted_models.get(provider_id)
+        if formatted_models is None:
+            formatted_models = self._formatted_models[provider_id] = [f"{provider_id}/{model}" for model in models_list]
+
         current_active_model = self.active_model_var.get()
-        
-        self.model_dropdown.configure(values=formatted_models)
-        
-        if current_active_model in formatted_models:
-            self.model_dropdown.set(current_active_model)
-        elif formatted_models:
-            self.active_model_var.set(formatted_models[0])
-        else:
-            self.active_model_var.set("")
-            self.model_dropdown.set("")
+
+        if formatted_models != self._model_dropdown_values:
+            self.model_dropdown.configure(values=formatted_models)
+            self._model_dropdown_values = formatted_models
+
+        # The dropdown tracks active_model_var; set it once, and only when it changes.
+        if current_active_model not in formatted_models:
+            fallback = formatted_models[0] if formatted_models else ""
+            if current_active_model != fallback:
+                self.active_provider_var.set(provider_id if fallback else "")
+                self.active_model_var.set(fallback)
+
+        self._last_active_dropdown_for = provider_id
+        self._last_active_dropdown_models = list(models_list)
 
     def update_model_ui(self, provider_id: str):
         self.logger.debug(f"Updating model management UI for provider: {provider_id}")
         
         models_list = self.staged_model_lists.get(provider_id, [])
-        
-        for widget in self.model_list_frame.winfo_children():
-            widget.destroy()
-            
-        for model_name in models_list:
-            frame = ctk.CTkFrame(self.model_list_frame)
-            frame.pack(fill="x", expand=True, padx=5, pady=2)
-            frame.grid_columnconfigure(0, weight=1)
 
-            label = ctk.CTkLabel(frame, text=model_name)
-            label.grid(row=0, column=0, padx=5, pady=5, sticky="w")
-
-            menu_button = ctk.CTkButton(frame, text="⋮", width=30)
-            menu_button.grid(row=0, column=1, padx=5, pady=5, sticky="e")
+        # Unmap the list while its rows are updated so Tk lays it out and
+        # redraws it once when it is shown again, not once per row.
+        self.model_list_frame.grid_remove()
+
+        for index, model_name in enumerate(models_list):
+            if index < len(self._model_rows):
+                frame, label, menu_button = self._model_rows[index]
+                label.configure(text=model_name)
+            else:
+                frame, label, menu_button = self._create_model_row(model_name)
+                self._model_rows.append((frame, label, menu_button))
             menu_button.configure(command=lambda p=provider_id, m=model_name, w=menu_button: self._show_model_menu(p, m, w))
+            if not frame.winfo_manager():
+                frame.pack(fill="x", expand=True, padx=5, pady=2)
+
+        for frame, _, _ in self._model_rows[len(models_list):]:
+            frame.pack_forget()
+
+        self.model_list_frame.grid()
+
+    def _create_model_row(self, model_name: str):
+        frame = ctk.CTkFrame(self.model_list_frame)
+        frame.grid_columnconfigure(0, weight=1)
+
+        label = ctk.CTkLabel(frame, text=model_name)
+        label.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+
+        menu_button = ctk.CTkButton(frame, text="⋮", width=30)
+        menu_button.grid(row=0, column=1, padx=5, pady=5, sticky="e")
+        return frame, label, menu_button
 
     def _add_model_to_ui(self, event=None):
         provider_id = self.manage_provider_var.get()
@@ -107,9 +167,7 @@ class ModelsTab(ctk.CTkFrame):
         if new_model and new_model not in self.staged_model_lists[provider_id]:
             self.logger.info(f"Staging new model '{new_model}' for provider '{provider_id}'")
             self.staged_model_lists[provider_id].append(new_model)
-            self.update_model_ui(provider_id)
-            self.update_active_model_dropdown(provider_id)
-            self.events.publish("SETTINGS_EVENT.MODEL_LIST_CHANGED")
+            self._schedule_refresh(provider_id)
             self.new_model_entry.delete(0, "end")
             self._mark_dirty() 
         else:
@@ -119,28 +177,41 @@ class ModelsTab(ctk.CTkFrame):
         if model_name in self.staged_model_lists[provider_id]:
             self.logger.info(f"Unstaging model '{model_name}' for provider '{provider_id}'")
             self.staged_model_lists[provider_id].remove(model_name)
-            self.update_model_ui(provider_id)
-            self.update_active_model_dropdown(provider_id)
-            self.events.publish("SETTINGS_EVENT.MODEL_LIST_CHANGED")
+            self._schedule_refresh(provider_id)
             self._mark_dirty()
         else:
             self.logger.warning(f"Could not find model '{model_name}' to remove.")
 
+    def _schedule_refresh(self, provider_id: str):
+        self._dirty_providers.add(provider_id)
+        if not self._refresh_scheduled:
+            self._refresh_scheduled = True
+            self.after_idle(self._flush_model_ui)
+
+    def _flush_model_ui(self):
+        """Repaints everything that depends on the staged lists changed since the last flush."""
+        self._refresh_scheduled = False
+        dirty, self._dirty_providers = self._dirty_providers, set()
+        for provider_id in dirty:
+            self._formatted_models.pop(provider_id, None)
+        current_provider = self.manage_provider_var.get()
+        if current_provider in dirty:
+            self.update_model_ui(current_provider)
+            self.update_active_model_dropdown(current_provider)
+        if dirty and self._models_changed_callback:
+            self._models_changed_callback()
+
     def _show_model_menu(self, provider_id: str, model_name: str, widget: ctk.CTkButton):
-        menu = tk.Menu(self, tearoff=0)
-        menu.add_command(label="Remove", command=lambda: self._remove_model_from_ui(provider_id, model_name))
-        menu.add_command(label="Set as Default", command=lambda: self._set_model_as_default(provider_id, model_name))
-        menu.add_command(label="Test Model", command=lambda: self._test_model(provider_id, model_name))
+        menu = self._model_menu
+        menu.entryconfigure(0, command=lambda: self._remove_model_from_ui(provider_id, model_name))
+        menu.entryconfigure(1, command=lambda: self._set_model_as_default(provider_id, model_name))
+        menu.entryconfigure(2, command=lambda: self._test_model(provider_id, model_name))
         menu.post(widget.winfo_rootx(), widget.winfo_rooty() + widget.winfo_height())
 
     def _set_model_as_default(self, provider_id: str, model_name: str):
         formatted_model = f"{provider_id}/{model_name}"
-        all_models = []
-        for p, m_list in self.staged_model_lists.items():
-            for m in m_list:
-                all_models.append(f"{p}/{m}")
-
-        if formatted_model in all_models:
+        if model_name in self.staged_model_lists.get(provider_id, ()):
+            self.active_provider_var.set(provider_id)
             self.active_model_var.set(formatted_model)
             self.logger.info(f"Set active model to: {formatted_model}")
             self._mark_dirty()
@@ -152,11 +223,33 @@ class ModelsTab(ctk.CTkFrame):
         # This event needs to be published to the main async loop
         app = self.locator.resolve("app")
         async_loop = getattr(app, "async_loop", None)
-        if async_loop:
+        if async_loop and not async_loop.is_closed():
             coro = self.events.publish("API_EVENT.TEST_MODEL", provider=provider_id, model=model_name, timeout=5)
             asyncio.run_coroutine_threadsafe(coro, async_loop)
         else:
             self.logger.error("Could not find async loop to publish test event.")
 
+    def refresh(self):
+        """Re-renders the current provider, e.g. after release_rows()."""
+        self._on_manage_provider_changed()
+
+    def release_rows(self):
+        """Destroys the pooled model rows and cached names while the window is hidden."""
+        for frame, _, _ in self._model_rows:
+            frame.destroy()
+        self._model_rows.clear()
+        self._formatted_models = {}
+        self._last_active_dropdown_for = None
+
+    def set_formatted_cache(self, formatted_by_provider: dict):
+        """Call after staged_model_lists is replaced wholesale (e.g. on reload)."""
+        self._formatted_models = formatted_by_provider
+        self._last_active_dropdown_for = None
+
     def set_provider_options(self, provider_ids):
-        self.manage_provider_dropdown.configure(values=provider_ids)
+        """Accepts any iterable of ids (e.g. a dict keys view); CTk needs a list."""
+        if not isinstance(provider_ids, list):
+            provider_ids = list(provider_ids)
+        if provider_ids != self._provider_options:
+            self.manage_provider_dropdown.configure(values=provider_ids)
+            self._provider_options = provider_ids
@@ -1,9 +1,9 @@
 # file: ui/settings_window.py
 
+import time
 import logging
 import asyncio
 import customtkinter as ctk
-import tkinter as tk
 from tkinter import messagebox
 from core.service_locator import locator
 from core.event_dispatcher import EventDispatcher
@@ -15,17 +15,46 @@ from .settings_tabs.hotkeys_tab import HotkeysTab
 from .settings_tabs.plugins_tab import PluginsTab
 from .settings_tabs.coming_soon_tab import ComingSoonTab
 
+# Fallbacks for values missing from the on-disk configs.
+_DEFAULTS = {
+    "theme": "System",
+    "ollama_base_url": "http://localhost:11434",
+    "hotkeys": {
+        "open_chat": "<ctrl>+<shift>+<space>",
+        "screen_capture": "<ctrl>+<shift>+x",
+    },
+}
+
+def _set_entry_if_changed(entry, value: str):
+    """Replaces an entry's text only when it differs, sparing Tk a clear and redraw."""
+    if entry.get() != value:
+        entry.delete(0, "end")
+        entry.insert(0, value)
+
+# Quiet period after the last keystroke before edited entries are re-checked.
+_DEBOUNCE_MS = 50
+
+# Files the settings form is loaded from.
+_SETTINGS_CONFIGS = ("ui_config.json", "models_config.json", "system_config.json")
+
+# Dirty-field names grouped by the config file they are saved to.
+_MODELS_CONFIG_FIELDS = frozenset({"active_model", "models", "gemini_key", "openrouter_key", "ollama_url"})
+_SYSTEM_CONFIG_FIELDS = frozenset({"hotkey_chat", "hotkey_screen", "plugin_screencapture"})
+
 class SettingsWindow(ctk.CTkToplevel):
     """
     The main settings window, now acting as a container for modular tabs.
     """
     def __init__(self, master):
         super().__init__(master)
-        self.master = master
         self.locator = locator
         self.events: EventDispatcher = self.locator.resolve("event_dispatcher")
         self.config: ConfigLoader = self.locator.resolve("config_loader")
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._app = self.locator.resolve("app")
+        # The app starts its loop after building this window; cached on first use.
+        self._async_loop = None
+        self._warned_no_loop = False
         
         self.title("Settings")
         self.geometry("1050x480")
@@ -41,14 +70,16 @@ class SettingsWindow(ctk.CTkToplevel):
         self.is_visible = False
         
         self.events.subscribe("API_EVENT.TEST_CONNECTION_RESULT", self.on_connection_test_result)
-        self.events.subscribe("SETTINGS_EVENT.MODEL_LIST_CHANGED", self._on_model_list_changed)
-
-        self._show_content_frame("General")
+        self.events.subscribe("UI_EVENT.SETTINGS_CHANGED", self._on_settings_changed)
 
     def _init_vars(self):
         """Initialize all tk variables."""
         self.staged_model_lists = {}
+        self._pristine_models = {}
+        # active_model_var holds the "provider/model" display string the dropdown
+        # shows; the provider is kept separately so saving needs no parsing.
         self.active_model_var = ctk.StringVar()
+        self.active_provider_var = ctk.StringVar()
         self.manage_provider_var = ctk.StringVar()
         self.theme_var = ctk.StringVar()
         self.gemini_test_model_var = ctk.StringVar()
@@ -57,6 +88,24 @@ class SettingsWindow(ctk.CTkToplevel):
         self.plugin_screencapture_enabled_var = ctk.StringVar(value="on")
         self.has_unsaved_changes = False
         self.is_loading_settings = False
+        self._settings_loaded = False
+        # Set when the form may no longer match disk (edits were saved or discarded).
+        self._needs_reload = False
+        # The config dicts the form was last loaded from.
+        self._loaded_configs = None
+        self._loaded_snapshot = {}
+        # Saved fields by snapshot key; entry-backed fields are added as their tabs are built.
+        self._field_getters = {
+            "theme": self.theme_var.get,
+            "active_model": self.active_model_var.get,
+            "plugin_screencapture": self.plugin_screencapture_enabled_var.get,
+            "models": lambda: {p: tuple(models) for p, models in self.staged_model_lists.items()},
+        }
+        self._field_dirty = {}
+        self._provider_widgets = {}
+        self._pending_fields = set()
+        self._field_check_job = None
+        self._last_keystroke = 0.0
 
     def _setup_ui(self):
         """Setup main UI layout and buttons."""
@@ -70,8 +119,14 @@ class SettingsWindow(ctk.CTkToplevel):
         self.content_frame.grid_columnconfigure(0, weight=1)
 
         self.nav_buttons = {}
+        # Tabs are built the first time they are shown; unbuilt tabs map to None.
         self.content_frames = {}
+        self._tab_factories = {}
+        self._disabled_tabs = set()
+        # No tab (not even General) is built until the window is first shown.
+        self._current_tab = None
         
+        self._cache_theme_colors()
         self._create_all_tabs()
 
         self.button_frame = ctk.CTkFrame(self)
@@ -84,7 +139,7 @@ class SettingsWindow(ctk.CTkToplevel):
         self.close_button.pack(side="left", padx=5)
 
     def _create_all_tabs(self):
-        """Instantiate and add all setting tabs."""
+        """Registers all setting tabs; each is built on first selection."""
         self._add_nav_item("General", self._create_general_tab)
         self._add_nav_item("Models", self._create_models_tab)
         self._add_nav_item("API Keys", self._create_api_keys_tab)
@@ -92,57 +147,117 @@ class SettingsWindow(ctk.CTkToplevel):
         self._add_nav_item("Plugins", self._create_plugins_tab)
         self._add_nav_item("MCP Servers", lambda parent: ComingSoonTab(parent), is_disabled=True)
 
+    def _cache_theme_colors(self):
+        """Reads the nav button colors from the CTk theme once instead of per click."""
+        theme = ctk.ThemeManager.theme
+        self._theme_active_bg = theme["CTkButton"]["fg_color"]
+        self._theme_default_text = theme["CTkLabel"]["text_color"]
+        self._theme_active_text = theme["CTkButton"]["text_color"]
+        self._theme_disabled_text = theme["CTkButton"]["text_color_disabled"]
+
+    def _on_settings_changed(self, *args, **kwargs):
+        # Runs on the async loop's thread; hand the Tk work to the UI thread.
+        self.after(0, self._refresh_theme_colors)
+
+    def _refresh_theme_colors(self):
+        """Re-reads the cached theme colors and restyles the nav buttons with them."""
+        self._cache_theme_colors()
+        if self._current_tab is not None:
+            self._show_content_frame(self._current_tab)
+
     def _add_nav_item(self, name: str, creation_func, is_disabled=False):
-        """Adds a button to the sidebar and creates its corresponding content frame."""
-        frame = creation_func(self.content_frame)
-        self.content_frames[name] = frame
-        
-        default_text_color = ctk.ThemeManager.theme["CTkLabel"]["text_color"]
-        if is_disabled:
-            default_text_color = ctk.ThemeManager.theme["CTkButton"]["text_color_disabled"]
+        """Adds a button to the sidebar and registers the factory for its content frame."""
+        self._tab_factories[name] = creation_func
+        self.content_frames[name] = None
 
         button = ctk.CTkButton(
             self.sidebar, text=name, command=lambda n=name: self._show_content_frame(n),
-            fg_color="transparent", anchor="w", text_color=default_text_color
+            fg_color="transparent", anchor="w",
+            text_color=self._theme_disabled_text if is_disabled else self._theme_default_text
         )
         button.pack(fill="x", padx=10, pady=5)
         
         if is_disabled:
             button.configure(state="disabled")
+            self._disabled_tabs.add(name)
         self.nav_buttons[name] = button
 
     def _show_content_frame(self, name: str):
         """Shows the specified content frame and updates nav button styles."""
-        active_color = ctk.ThemeManager.theme["CTkButton"]["fg_color"]
-        default_text_color = ctk.ThemeManager.theme["CTkLabel"]["text_color"]
-        active_text_color = ctk.ThemeManager.theme["CTkButton"]["text_color"]
-
+        self._current_tab = name
         for frame_name, frame in self.content_frames.items():
-            button = self.nav_buttons[frame_name]
-            if button.cget("state") == "disabled":
+            if frame_name in self._disabled_tabs:
                 continue
+            button = self.nav_buttons[frame_name]
 
             if frame_name == name:
-                frame.grid(row=0, column=0, sticky="nsew") 
-                button.configure(fg_color=active_color, text_color=active_text_color)
+                if frame is None:
+                    frame = self._build_tab(name)
+                frame.tkraise()
+                button.configure(fg_color=self._theme_active_bg, text_color=self._theme_active_text)
             else:
-                frame.grid_forget() 
-                button.configure(fg_color="transparent", text_color=default_text_color)
+                button.configure(fg_color="transparent", text_color=self._theme_default_text)
+
+    def _build_tab(self, name: str):
+        """Creates a tab's content frame; traces fired while it renders don't mark the form dirty."""
+        was_loading = self.is_loading_settings
+        self.is_loading_settings = True
+        try:
+            frame = self._tab_factories[name](self.content_frame)
+        finally:
+            self.is_loading_settings = was_loading
+        # Every tab shares one grid cell; switching tabs only changes stacking order.
+        frame.grid(row=0, column=0, sticky="nsew")
+        self.content_frames[name] = frame
+        return frame
 
-    def _mark_dirty(self, *args):
+    def _on_field_changed(self, *fields: str):
+        """Re-checks only the named fields against the loaded settings and updates Save."""
         if self.is_loading_settings: return
-        if not self.has_unsaved_changes:
-            self.has_unsaved_changes = True
-            self.save_button.configure(state="normal")
+        for field in fields:
+            self._field_dirty[field] = self._field_getters[field]() != self._loaded_snapshot[field]
+        is_dirty = any(self._field_dirty.values())
+        if is_dirty != self.has_unsaved_changes:
+            self.has_unsaved_changes = is_dirty
+            self.save_button.configure(state="normal" if is_dirty else "disabled")
+
+    def _debounced_field_changed(self, *fields: str):
+        """
+        Keystroke handler; a burst of typing is checked once it pauses.
+        A keystroke only records its time; the single pending timer re-arms
+        itself until the entries have been idle for _DEBOUNCE_MS, instead of
+        every keystroke cancelling and rescheduling a Tk timer.
+        """
+        self._pending_fields.update(fields)
+        self._last_keystroke = time.monotonic()
+        if self._field_check_job is None:
+            self._field_check_job = self.after(_DEBOUNCE_MS, self._on_debounce_timer)
+
+    def _on_debounce_timer(self):
+        idle_ms = (time.monotonic() - self._last_keystroke) * 1000
+        if idle_ms < _DEBOUNCE_MS:
+            self._field_check_job = self.after(int(_DEBOUNCE_MS - idle_ms) + 1, self._on_debounce_timer)
+            return
+        self._field_check_job = None
+        self._flush_pending_fields()
+
+    def _flush_pending_fields(self):
+        if self._field_check_job is not None:
+            self.after_cancel(self._field_check_job)
+            self._field_check_job = None
+        self._last_keystroke = 0.0
+        fields, self._pending_fields = self._pending_fields, set()
+        self._on_field_changed(*fields)
 
     # --- Tab Creation Methods ---
     def _create_general_tab(self, parent):
         tab = GeneralTab(parent, self.theme_var)
-        self.theme_var.trace_add("write", self._mark_dirty)
+        self.theme_var.trace_add("write", lambda *_: self._on_field_changed("theme"))
         return tab
 
     def _create_models_tab(self, parent):
-        return ModelsTab(parent, self.locator, self.active_model_var, self.manage_provider_var, self.staged_model_lists, self._mark_dirty)
+        return ModelsTab(parent, self.locator, self.active_model_var, self.active_provider_var, self.manage_provider_var, self.staged_model_lists,
+                         lambda *_: self._on_field_changed("active_model", "models"), self._on_model_list_changed)
 
     def _create_api_keys_tab(self, parent):
         test_model_vars = {
@@ -150,17 +265,40 @@ class SettingsWindow(ctk.CTkToplevel):
             'openrouter': self.openrouter_test_model_var,
             'ollama': self.ollama_test_model_var
         }
-        return ApiKeysTab(parent, test_model_vars, self.test_connection, self._mark_dirty)
+        tab = ApiKeysTab(parent, test_model_vars, self.test_connection,
+                         lambda _event: self._debounced_field_changed("gemini_key", "openrouter_key", "ollama_url"))
+        self._field_getters.update(
+            gemini_key=tab.gemini_key_entry.get,
+            openrouter_key=tab.openrouter_key_entry.get,
+            ollama_url=tab.ollama_url_entry.get,
+        )
+        # provider -> (key/URL getter, test model var), used by test_connection
+        self._provider_widgets = {
+            "gemini": (tab.gemini_key_entry.get, self.gemini_test_model_var),
+            "openrouter": (tab.openrouter_key_entry.get, self.openrouter_test_model_var),
+            "ollama": (tab.ollama_url_entry.get, self.ollama_test_model_var),
+        }
+        if self._settings_loaded:
+            self._populate_api_keys_tab(tab)
+        return tab
 
     def _create_hotkeys_tab(self, parent):
-        return HotkeysTab(parent, self._mark_dirty)
+        tab = HotkeysTab(parent, lambda _event: self._debounced_field_changed("hotkey_chat", "hotkey_screen"))
+        self._field_getters.update(
+            hotkey_chat=tab.chat_hotkey_entry.get,
+            hotkey_screen=tab.screen_hotkey_entry.get,
+        )
+        if self._settings_loaded:
+            self._populate_hotkeys_tab(tab)
+        return tab
 
     def _create_plugins_tab(self, parent):
-        return PluginsTab(parent, self.plugin_screencapture_enabled_var, self._mark_dirty)
+        return PluginsTab(parent, self.plugin_screencapture_enabled_var, lambda *_: self._on_field_changed("plugin_screencapture"))
 
     def _on_model_list_changed(self, *args):
         """Callback to update API key tab when model list changes in model tab."""
-        self.content_frames["API Keys"].update_test_model_dropdowns(self.staged_model_lists)
+        if (api_keys_tab := self.content_frames["API Keys"]) is not None:
+            api_keys_tab.update_test_model_dropdowns(self.staged_model_lists)
 
     def on_connection_test_result(self, provider: str, success: bool):
         self.logger.debug(f"Received connection test result: {provider} -> {success}")
@@ -168,118 +306,199 @@ class SettingsWindow(ctk.CTkToplevel):
 
     def update_status(self, provider: str, success: bool | None | str):
         color = "gray" if success is None else "orange" if success == "testing" else "green" if success else "red"
-        status_label = getattr(self.content_frames["API Keys"], f"{provider}_status", None)
+        if (api_keys_tab := self.content_frames["API Keys"]) is None:
+            return
+        status_label = getattr(api_keys_tab, f"{provider}_status", None)
         if status_label:
             status_label.configure(text_color=color)
 
     def load_settings(self):
         self.is_loading_settings = True
         self.has_unsaved_changes = False
+        self._field_dirty.clear()
         self.save_button.configure(state="disabled")
 
-        ui_config = self.config.get_config("ui_config.json")
-        models_config = self.config.get_config("models_config.json")
-        system_config = self.config.get_config("system_config.json")
+        cfg = self.config.snapshot()
+        ui_config, models_config, system_config = cfg.ui, cfg.models, cfg.system
 
         # General
-        self.theme_var.set(ui_config.get("theme", "System"))
+        self.theme_var.set(ui_config.get("theme", _DEFAULTS["theme"]))
         if geometry := ui_config.get("settings_window", {}).get("geometry"):
             self.geometry(geometry)
 
         # Models
         providers_data = models_config.get("providers", {})
+        # Tuples keep an immutable snapshot to diff against on save; the staged
+        # lists are private copies so edits don't leak into the loaded config.
+        # One pass over the providers fills every per-provider structure.
+        self._pristine_models = {}
         self.staged_model_lists.clear()
-        self.staged_model_lists.update({p: d.get("models", []) for p, d in providers_data.items()})
-        
         models_tab = self.content_frames["Models"]
-        provider_ids = list(self.staged_model_lists.keys())
-        models_tab.set_provider_options(provider_ids)
+        # Display names are only needed by a built Models tab.
+        formatted_by_provider = {} if models_tab is not None else None
+        for provider_id, provider_data in providers_data.items():
+            models = provider_data.get("models", [])
+            self._pristine_models[provider_id] = tuple(models)
+            self.staged_model_lists[provider_id] = list(models)
+            if formatted_by_provider is not None:
+                formatted_by_provider[provider_id] = [f"{provider_id}/{m}" for m in models]
+        
+        provider_ids = self.staged_model_lists.keys()
+        if models_tab is not None:
+            models_tab.set_formatted_cache(formatted_by_provider)
+            models_tab.set_provider_options(provider_ids)
         
         active_provider = models_config.get("active_provider")
         active_model = models_config.get("active_model")
-        formatted_active_model = f"{active_provider}/{active_model}"
-        all_models_formatted = [f"{p}/{m}" for p, ml in self.staged_model_lists.items() for m in ml]
-
-        if active_model and formatted_active_model in all_models_formatted:
-            self.active_model_var.set(formatted_active_model)
-        elif all_models_formatted:
-            self.active_model_var.set(all_models_formatted[0])
-            active_provider, _ = all_models_formatted[0].split("/", 1)
+
+        if active_model and active_model in self.staged_model_lists.get(active_provider, ()):
+            self.active_provider_var.set(active_provider)
+            self.active_model_var.set(f"{active_provider}/{active_model}")
+        elif first := next(self.config.iter_all_models(), None):
+            # Fall back to the first model of any provider (staged lists match the config here).
+            active_provider, first_model = first
+            self.active_provider_var.set(active_provider)
+            self.active_model_var.set(f"{active_provider}/{first_model}")
         else:
+            self.active_provider_var.set("")
             self.active_model_var.set("")
 
+        # Setting the provider fires ModelsTab's trace, which rebuilds the model
+        # list and the active-model dropdown; don't call those updaters again here.
         if active_provider and active_provider in provider_ids:
             self.manage_provider_var.set(active_provider)
         elif provider_ids:
-            self.manage_provider_var.set(provider_ids[0])
+            self.manage_provider_var.set(next(iter(provider_ids)))
         else:
             self.manage_provider_var.set("")
 
-        # API Keys
-        api_keys_tab = self.content_frames["API Keys"]
-        api_keys_tab.gemini_key_entry.delete(0, "end")
-        api_keys_tab.gemini_key_entry.insert(0, providers_data.get("gemini", {}).get("api_key", ""))
-        api_keys_tab.openrouter_key_entry.delete(0, "end")
-        api_keys_tab.openrouter_key_entry.insert(0, providers_data.get("openrouter", {}).get("api_key", ""))
-        api_keys_tab.ollama_url_entry.delete(0, "end")
-        api_keys_tab.ollama_url_entry.insert(0, providers_data.get("ollama", {}).get("base_url", "http://localhost:11434"))
-        api_keys_tab.update_test_model_dropdowns(self.staged_model_lists)
-        self.update_status("gemini", None)
-        self.update_status("openrouter", None)
-        self.update_status("ollama", None)
-
-        # Hotkeys
-        hotkeys_tab = self.content_frames["Hotkeys"]
-        hotkeys_tab.chat_hotkey_entry.delete(0, "end")
-        hotkeys_tab.chat_hotkey_entry.insert(0, system_config.get("hotkeys", {}).get("open_chat", "<ctrl>+<shift>+<space>"))
-        hotkeys_tab.screen_hotkey_entry.delete(0, "end")
-        hotkeys_tab.screen_hotkey_entry.insert(0, system_config.get("hotkeys", {}).get("screen_capture", "<ctrl>+<shift>+x"))
-
         # Plugins
         plugin_config = system_config.get("plugins", {}).get("ScreenCapture", {})
         self.plugin_screencapture_enabled_var.set("on" if plugin_config.get("enabled", True) else "off")
 
+        # The snapshot is the single traversal of the nested config dicts; the
+        # entry tabs are populated from it, now or whenever they are built.
+        gemini = providers_data.get("gemini", {})
+        openrouter = providers_data.get("openrouter", {})
+        ollama = providers_data.get("ollama", {})
+        hotkeys = system_config.get("hotkeys", {})
+        self._loaded_snapshot = {
+            "theme": self.theme_var.get(),
+            "active_model": self.active_model_var.get(),
+            "plugin_screencapture": self.plugin_screencapture_enabled_var.get(),
+            "models": dict(self._pristine_models),
+            "gemini_key": gemini.get("api_key", ""),
+            "openrouter_key": openrouter.get("api_key", ""),
+            "ollama_url": ollama.get("base_url", _DEFAULTS["ollama_base_url"]),
+            "hotkey_chat": hotkeys.get("open_chat", _DEFAULTS["hotkeys"]["open_chat"]),
+            "hotkey_screen": hotkeys.get("screen_capture", _DEFAULTS["hotkeys"]["screen_capture"]),
+        }
+
+        # API Keys & Hotkeys (entries only exist once their tab is built)
+        if (api_keys_tab := self.content_frames["API Keys"]) is not None:
+            self._populate_api_keys_tab(api_keys_tab)
+        if (hotkeys_tab := self.content_frames["Hotkeys"]) is not None:
+            self._populate_hotkeys_tab(hotkeys_tab)
+
+        self._settings_loaded = True
+        self._needs_reload = False
+        self._loaded_configs = (ui_config, models_config, system_config)
         self.is_loading_settings = False
 
+    def _configs_changed(self) -> bool:
+        """
+        True if a settings config was edited outside the app, or reloaded or
+        replaced in the loader, since the form was loaded. Files edited
+        outside the app are reloaded here. The window's own saves (e.g.
+        geometry on hide) go through the loader and don't count.
+        """
+        # A list, not any(), so every edited file is reloaded.
+        reloaded = [self.config.reload_if_changed(filename) for filename in _SETTINGS_CONFIGS]
+        return any(reloaded) or any(
+            self.config.configs.get(filename) is not loaded
+            for filename, loaded in zip(_SETTINGS_CONFIGS, self._loaded_configs)
+        )
+
+    def _populate_api_keys_tab(self, api_keys_tab: ApiKeysTab):
+        loaded = self._loaded_snapshot
+        _set_entry_if_changed(api_keys_tab.gemini_key_entry, loaded["gemini_key"])
+        _set_entry_if_changed(api_keys_tab.openrouter_key_entry, loaded["openrouter_key"])
+        _set_entry_if_changed(api_keys_tab.ollama_url_entry, loaded["ollama_url"])
+        api_keys_tab.update_test_model_dropdowns(self.staged_model_lists)
+
+    def _populate_hotkeys_tab(self, hotkeys_tab: HotkeysTab):
+        loaded = self._loaded_snapshot
+        _set_entry_if_changed(hotkeys_tab.chat_hotkey_entry, loaded["hotkey_chat"])
+        _set_entry_if_changed(hotkeys_tab.screen_hotkey_entry, loaded["hotkey_screen"])
+
     def save_settings(self):
+        # Fold in keystrokes still waiting on the debounce timer, or a field
+        # edited just before Save would be missing from the dirty set.
+        if self._field_check_job is not None:
+            self._flush_pending_fields()
+        if not self.has_unsaved_changes:
+            # Nothing to write; finish the way a real save does.
+            self.logger.debug("save_settings called with no changes; skipping")
+            self.hide(force=True)
+            return
         self.logger.info("Saving settings...")
-        
-        ui_config = self.config.get_config("ui_config.json")
-        models_config = self.config.get_config("models_config.json")
-        system_config = self.config.get_config("system_config.json")
 
-        # UI
-        ui_config["theme"] = self.theme_var.get()
-        self._save_geometry()
-        self.config.save_config("ui_config.json", ui_config)
-        ctk.set_appearance_mode(self.theme_var.get().lower())
+        # Only the config files owning a dirty field are rewritten.
+        dirty = {field for field, is_dirty in self._field_dirty.items() if is_dirty}
+        updates = {}
+
+        # UI (a moved/resized window rides along in the same batch, leaving
+        # nothing for hide() to persist afterwards)
+        ui_config = self.config.get_config("ui_config.json")
+        window_config = ui_config.setdefault("settings_window", {})
+        geometry = self.geometry()
+        if "theme" in dirty or window_config.get("geometry") != geometry:
+            ui_config["theme"] = self.theme_var.get()
+            window_config["geometry"] = geometry
+            updates["ui_config.json"] = ui_config
         
         # Models
-        if "/" in (active_model_str := self.active_model_var.get()):
-            provider, model = active_model_str.split("/", 1)
-            models_config["active_provider"] = provider
-            models_config["active_model"] = model
-        else:
-            models_config["active_provider"] = self.manage_provider_var.get()
-            models_config["active_model"] = ""
-        
-        api_keys_tab = self.content_frames["API Keys"]
-        models_config["providers"]["gemini"]["api_key"] = api_keys_tab.gemini_key_entry.get()
-        models_config["providers"]["openrouter"]["api_key"] = api_keys_tab.openrouter_key_entry.get()
-        models_config["providers"]["ollama"]["base_url"] = api_keys_tab.ollama_url_entry.get()
-        
-        for provider_id, models_list in self.staged_model_lists.items():
-            if provider_id in models_config["providers"]:
-                models_config["providers"][provider_id]["models"] = models_list
-        self.config.save_config("models_config.json", models_config)
+        if dirty & _MODELS_CONFIG_FIELDS:
+            models_config = self.config.get_config("models_config.json")
+            provider = self.active_provider_var.get()
+            if provider and (active_model_str := self.active_model_var.get()):
+                models_config["active_provider"] = provider
+                models_config["active_model"] = active_model_str[len(provider) + 1:]
+            else:
+                models_config["active_provider"] = self.manage_provider_var.get()
+                models_config["active_model"] = ""
+            
+            # Tabs that were never opened can't have edits; keep their stored values.
+            providers = models_config["providers"]
+            if (api_keys_tab := self.content_frames["API Keys"]) is not None:
+                providers["gemini"]["api_key"] = api_keys_tab.gemini_key_entry.get()
+                providers["openrouter"]["api_key"] = api_keys_tab.openrouter_key_entry.get()
+                providers["ollama"]["base_url"] = api_keys_tab.ollama_url_entry.get()
+            
+            for provider_id, models_list in self.staged_model_lists.items():
+                if tuple(models_list) != self._pristine_models.get(provider_id):
+                    providers.setdefault(provider_id, {})["models"] = models_list
+            updates["models_config.json"] = models_config
         
         # System
-        hotkeys_tab = self.content_frames["Hotkeys"]
-        system_config["hotkeys"]["open_chat"] = hotkeys_tab.chat_hotkey_entry.get()
-        system_config["hotkeys"]["screen_capture"] = hotkeys_tab.screen_hotkey_entry.get()
-        system_config.setdefault("plugins", {}).setdefault("ScreenCapture", {})
-        system_config["plugins"]["ScreenCapture"]["enabled"] = (self.plugin_screencapture_enabled_var.get() == "on")
-        self.config.save_config("system_config.json", system_config)
+        if dirty & _SYSTEM_CONFIG_FIELDS:
+            system_config = self.config.get_config("system_config.json")
+            if (hotkeys_tab := self.content_frames["Hotkeys"]) is not None:
+                system_config["hotkeys"]["open_chat"] = hotkeys_tab.chat_hotkey_entry.get()
+                system_config["hotkeys"]["screen_capture"] = hotkeys_tab.screen_hotkey_entry.get()
+            # Plain lookups in the usual case where both levels already exist.
+            plugins = system_config.get("plugins")
+            if plugins is None:
+                plugins = system_config["plugins"] = {}
+            screen_capture = plugins.get("ScreenCapture")
+            if screen_capture is None:
+                screen_capture = plugins["ScreenCapture"] = {}
+            screen_capture["enabled"] = (self.plugin_screencapture_enabled_var.get() == "on")
+            updates["system_config.json"] = system_config
+
+        self.config.save_many(updates)
+        if "theme" in dirty:
+            ctk.set_appearance_mode(self.theme_var.get().lower())
 
         self.publish_async_event("UI_EVENT.SETTINGS_CHANGED")
         
@@ -288,25 +507,21 @@ class SettingsWindow(ctk.CTkToplevel):
         self.hide(force=True)
 
     def _save_geometry(self):
-        ui_config = self.config.get_config("ui_config.json")
-        ui_config.setdefault("settings_window", {})["geometry"] = self.geometry()
-        self.config.save_config("ui_config.json", ui_config)
+        """Persists the window geometry on the config writer thread if it changed."""
+        geometry = self.geometry()
+        if self.config.get_config("ui_config.json").get("settings_window", {}).get("geometry") == geometry:
+            return
+        self.config.update_in_background("ui_config.json", "settings_window", "geometry", geometry)
 
     def test_connection(self, provider: str):
         self.logger.info(f"Requesting connection test for: {provider}")
         self.update_status(provider, "testing")
 
-        api_keys_tab = self.content_frames["API Keys"]
         key_or_url, model_name = "", ""
-        if provider == "gemini": 
-            key_or_url = api_keys_tab.gemini_key_entry.get()
-            model_name = self.gemini_test_model_var.get()
-        elif provider == "openrouter": 
-            key_or_url = api_keys_tab.openrouter_key_entry.get()
-            model_name = self.openrouter_test_model_var.get()
-        elif provider == "ollama": 
-            key_or_url = api_keys_tab.ollama_url_entry.get()
-            model_name = self.ollama_test_model_var.get()
+        if widgets := self._provider_widgets.get(provider):
+            key_getter, model_var = widgets
+            key_or_url = key_getter()
+            model_name = model_var.get()
 
         if not model_name:
             self.logger.warning(f"No model selected for {provider} test.")
@@ -317,26 +532,47 @@ class SettingsWindow(ctk.CTkToplevel):
         self.publish_async_event("API_EVENT.TEST_CONNECTION", provider=provider, value=key_or_url, model=model_name, timeout=5)
         
     def publish_async_event(self, event_type: str, *args, **kwargs):
-        app = self.locator.resolve("app")
-        async_loop = getattr(app, "async_loop", None)
-        if not async_loop:
-            self.logger.warning("Async loop not available. Cannot publish event.")
+        if self._async_loop is None:
+            self._async_loop = getattr(self._app, "async_loop", None)
+            if self._async_loop is None:
+                if not self._warned_no_loop:
+                    self.logger.warning("Async loop not available. Cannot publish event.")
+                    self._warned_no_loop = True
+                return
+        # Check before creating the coroutine; one that can't be scheduled is never awaited.
+        if self._async_loop.is_closed():
+            self.logger.warning(f"Async loop is closed. Dropping event {event_type}.")
             return
         coro = self.events.publish(event_type, *args, **kwargs)
-        asyncio.run_coroutine_threadsafe(coro, async_loop)
+        asyncio.run_coroutine_threadsafe(coro, self._async_loop)
 
     def show(self):
-        self.load_settings()
+        # A clean form over unchanged files is still accurate; skip the reload.
+        if not self._settings_loaded or self._needs_reload or self._configs_changed():
+            self.load_settings()
+        elif (models_tab := self.content_frames["Models"]) is not None:
+            models_tab.refresh()
+        # Connection test results are per visit; every open starts unknown.
+        for provider in self._provider_widgets:
+            self.update_status(provider, None)
+        if self._current_tab is None:
+            self._show_content_frame("General")
         self.deiconify()
         self.lift()
         self.focus_force()
         self.is_visible = True
         
     def hide(self, force: bool = False):
+        if self._field_check_job is not None:
+            self._flush_pending_fields()
         if self.has_unsaved_changes and not force:
             if not messagebox.askyesno("Unsaved Changes", "You have unsaved changes. Are you sure you want to close without saving?"):
                 return
         self._save_geometry()
+        if any(self._field_dirty.values()):
+            self._needs_reload = True
+        if (models_tab := self.content_frames["Models"]) is not None:
+            models_tab.release_rows()
         self.has_unsaved_changes = False
         self.save_button.configure(state="disabled")
         self.withdraw()
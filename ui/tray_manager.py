@@ -18,7 +18,10 @@ class TrayManager:
         self.events: EventDispatcher = self.locator.resolve("event_dispatcher")
         
         self.icon_path = Path(__file__).parent.parent / "assets" / "icons" / "icon.png"
-        self.icon_image = Image.open(self.icon_path)
+        # Decode the PNG into memory and release the file handle right away;
+        # pystray keeps its own reference to the image, so we don't hold one.
+        with Image.open(self.icon_path) as img:
+            icon_image = img.copy()
         
         self.menu = pystray.Menu(
             pystray.MenuItem("Open Chat", self.on_open_chat, default=True),
@@ -28,10 +31,13 @@ class TrayManager:
             pystray.MenuItem("Quit", self.on_quit)
         )
         
-        self.icon = pystray.Icon("PersonalAIAgent", self.icon_image, "Personal AI Agent", self.menu)
+        self.icon = pystray.Icon("PersonalAIAgent", icon_image, "Personal AI Agent", self.menu)
 
     def start(self):
         """Starts the pystray icon in a separate thread."""
+        # Not run_detached(): the Win32 and Xorg backends spawn a thread there
+        # anyway, and the GTK/AppIndicator and macOS backends expect us to run
+        # their native main loop, which neither Tk nor the async loop does.
         thread = threading.Thread(target=self.icon.run, daemon=True)
         thread.start()
 
@@ -1,12 +1,98 @@
 # file: utils/config_loader.py
 
+import copy
 import json
-import os
+import sys
 import logging
 import datetime
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType, SimpleNamespace
+from typing import Dict, Any, Callable, Iterator, Mapping, Optional, Tuple
 from core.exceptions import ConfigurationError
+from utils import json_io
+
+
+def _dumps(data: Dict) -> bytes:
+    """
+    Serializes a config for writing exactly as json.dumps(data, indent=4)
+    did: indent=4 with non-ASCII escaped. orjson supports neither, so config
+    writes always use stdlib json.
+    """
+    return json_io.dumps(data, indent=4, ensure_ascii=True)
+
+# Built once at import and shared by every loader, so it is read-only; the
+# nested dicts are never handed out (see _default_copy).
+_DEFAULTS = MappingProxyType({
+    "ui_config.json": {"theme": "system"},
+    "system_config.json": {
+        "hotkeys": {
+            "open_chat": "<ctrl>+<shift>+<space>",
+            "screen_capture": "<ctrl>+<shift>+x"
+        },
+        "event_priorities": {
+            "DEFAULT": 50,
+            "ERROR_EVENT": 0,
+            "SYSTEM_EVENT": 5,
+            "UI_EVENT": 10,
+            "USER_ACTION": 10,
+            "MODEL_RESPONSE": 20,
+            "LOGGING_EVENT": 100
+        }
+    },
+    "models_config.json": {
+        "active_provider": "gemini",
+        "active_model": "gemini-1.5-flash-latest",
+        "providers": {
+            "gemini": {"api_key": "", "models": ["gemini-1.5-flash-latest"]},
+            "openrouter": {"api_key": "", "models": []},
+            "ollama": {"base_url": "http://localhost:11434", "models": []}
+        }
+    },
+    "memory_config.json": {
+        "enabled": True,
+        "monitor_interval_sec": 60,
+        "threshold_mb": 500,
+        "log_level": "INFO"
+    },
+    "commands_config.json": {"max_history": 50},
+    "context_config.json": {
+        "max_messages": 50,
+        "pruning_strategy": "fifo",
+        "summarize_threshold": 20
+    }
+})
+
+# Each default serialized once; creating a missing default file is a plain write.
+_DEFAULT_BYTES = MappingProxyType({name: _dumps(data) for name, data in _DEFAULTS.items()})
+
+def _deep_merge(defaults: Mapping, loaded: Dict) -> Dict:
+    """
+    Returns loaded with any keys missing from it filled in from defaults,
+    recursing into nested dicts. Values present in loaded always win.
+    """
+    merged = dict(loaded)
+    for key, default_value in defaults.items():
+        if key not in merged:
+            merged[key] = copy.deepcopy(default_value)
+        elif isinstance(default_value, dict) and isinstance(merged[key], dict):
+            merged[key] = _deep_merge(default_value, merged[key])
+    return merged
+
+
+def _frozen_section(config: Dict, key: str) -> Mapping:
+    """A read-only copy of config[key] with interned keys."""
+    return MappingProxyType({sys.intern(k): v for k, v in config.get(key, {}).items()})
+
+
+def _flatten_models(models_config: Dict, _name: str) -> Tuple[Tuple[str, str], ...]:
+    """All (provider_id, model_name) pairs as one flat tuple."""
+    return tuple(
+        (provider_id, model)
+        for provider_id, provider_data in models_config.get("providers", {}).items()
+        for model in provider_data.get("models", ())
+    )
 
 class ConfigLoader:
     """
@@ -19,45 +105,24 @@ class ConfigLoader:
         self.config_dir.mkdir(parents=True, exist_ok=True)
         self.configs: Dict[str, Any] = {}
         self.logger = logging.getLogger(self.__class__.__name__)
-        self._defaults = {
-            "ui_config.json": {"theme": "system"},
-            "system_config.json": {
-                "hotkeys": {
-                    "open_chat": "<ctrl>+<shift>+<space>",
-                    "screen_capture": "<ctrl>+<shift>+x"
-                },
-                "event_priorities": {
-                    "DEFAULT": 50,
-                    "ERROR_EVENT": 0,
-                    "SYSTEM_EVENT": 5,
-                    "UI_EVENT": 10,
-                    "USER_ACTION": 10,
-                    "MODEL_RESPONSE": 20,
-                    "LOGGING_EVENT": 100
-                }
-            },
-            "models_config.json": {
-                "active_provider": "gemini",
-                "active_model": "gemini-1.5-flash-latest",
-                "providers": {
-                    "gemini": {"api_key": "", "models": ["gemini-1.5-flash-latest"]},
-                    "openrouter": {"api_key": "", "models": []},
-                    "ollama": {"base_url": "http://localhost:11434", "models": []}
-                }
-            },
-            "memory_config.json": {
-                "enabled": True,
-                "monitor_interval_sec": 60,
-                "threshold_mb": 500,
-                "log_level": "INFO"
-            },
-            "commands_config.json": {"max_history": 50},
-            "context_config.json": {
-                "max_messages": 50,
-                "pruning_strategy": "fifo",
-                "summarize_threshold": 20
-            }
-        }
+        # Per-file locks serialize readers and writers of the same file (UI windows
+        # persist geometry from background threads) while letting different files overlap.
+        self._file_locks: Dict[str, threading.Lock] = {}
+        # (mtime_ns, size, parsed data) of each file as last read or written by
+        # us, and the exact bytes; used to skip re-parsing unchanged files, spot
+        # external edits and skip no-op writes.
+        self._mtime_cache: Dict[str, Tuple[int, int, Dict]] = {}
+        self._last_written: Dict[str, bytes] = {}
+        # Shallow per-instance copy so tests can register extra defaults.
+        self._defaults = dict(_DEFAULTS)
+        # (filename, name) -> (config dict it was built from, derived value);
+        # see _derived_value. Guarded by _derived_lock, since save_many saves
+        # files on several threads at once.
+        self._derived: Dict[Tuple[str, str], Tuple[Dict, Any]] = {}
+        self._derived_lock = threading.Lock()
+        # Single worker for update_in_background, created on first use; one
+        # thread keeps background writes in call order.
+        self._writer: Optional[ThreadPoolExecutor] = None
 
     @property
     def defaults(self):
@@ -65,74 +130,273 @@ class ConfigLoader:
         return self._defaults
 
     def load_all_configs(self):
-        """Loads all default and existing .json config files."""
+        """
+        Creates any missing default config files. Existing files are not
+        parsed here; get_config() reads each one the first time it is asked for.
+        """
         self.configs = {}
-        
-        # Ensure all default configs are loaded/created
         for filename, default_data in self._defaults.items():
-            self.configs[filename] = self._load_config(filename, default_data)
-
-        # Load any other JSON files present that are not in defaults
-        for path in sorted(self.config_dir.glob("*.json")):
-            if path.name not in self.configs:
-                self.configs[path.name] = self._load_config(path.name, {})
+            if not (self.config_dir / filename).exists():
+                self.configs[filename] = self._load_config(filename, default_data)
 
-    def _load_config(self, filename: str, default_data: Dict) -> Dict:
+    def _load_config(self, filename: str, default_data: Dict, create_missing: bool = True) -> Optional[Dict]:
         """
-        Loads a single config file. If missing, creates it with default_data.
-        If invalid, backs it up and returns default_data.
+        Loads a single config file. If missing, creates it with default_data
+        (or returns None when create_missing is False); keys missing from an
+        existing file are filled in from default_data and written back. If
+        invalid, backs it up and returns default_data. Saves replace files
+        atomically, so this backup path only triggers for hand-edited files.
         """
         file_path = self.config_dir / filename
-        
-        if not file_path.exists():
-            self.logger.info(f"Config '{filename}' not found. Creating with defaults.")
+
+        # Reading under the file's lock keeps the recorded mtime/bytes consistent
+        # with a save of the same file running on another thread.
+        with self._file_locks.setdefault(filename, threading.Lock()):
+            try:
+                st = file_path.stat()
+                cached = self._mtime_cache.get(filename)
+                if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                    return cached[2]
+                raw = file_path.read_bytes()
+                data = json_io.loads(raw)
+                self._mtime_cache[filename] = (st.st_mtime_ns, st.st_size, data)
+                self._last_written[filename] = raw
+                if default_data and isinstance(data, dict):
+                    # Fill in keys added to the defaults since the file was written.
+                    merged = _deep_merge(default_data, data)
+                    if merged != data:
+                        self.logger.info(f"Adding missing default keys to {filename}.")
+                        try:
+                            self._write_file(filename, _dumps(merged), merged)
+                        except (IOError, OSError) as e:
+                            self.logger.error(f"Failed to write merged defaults to {filename}: {e}")
+                        return merged
+                return data
+            except FileNotFoundError:
+                # The stat above doubles as the existence check; the file is
+                # created below, outside this lock (save_config takes it too).
+                pass
+            except json.JSONDecodeError:
+                self.logger.error(f"Error reading {filename}. Backing up and using defaults.")
+                timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
+                backup_path = file_path.with_suffix(f"{file_path.suffix}.{timestamp}.bak")
+                try:
+                    file_path.rename(backup_path)
+                    self.logger.info(f"Backed up corrupted config to: {backup_path}")
+                except (IOError, OSError) as e_rename:
+                    self.logger.error(f"Failed to rename corrupted config {filename}: {e_rename}")
+                return self._default_copy(filename, default_data)
+            except (IOError, OSError) as e:
+                self.logger.error(f"Failed to load {filename}: {e}")
+                return self._default_copy(filename, default_data)
+            except Exception as e:
+                self.logger.error(f"Unexpected error loading {filename}: {e}")
+                return self._default_copy(filename, default_data)
+
+        if not create_missing:
+            return None
+        self.logger.info(f"Config '{filename}' not found. Creating with defaults.")
+        if default_data is not _DEFAULTS.get(filename):
             try:
                 self.save_config(filename, default_data)
             except ConfigurationError as e:
                 self.logger.error(f"Failed to create default config for {filename}: {e}")
                 return {} # Return empty if creation fails
             return default_data
-            
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            self.logger.error(f"Error reading {filename}. Backing up and using defaults.")
-            timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
-            backup_path = file_path.with_suffix(f"{file_path.suffix}.{timestamp}.bak")
+
+        # Built-in default: write the pre-serialized bytes, skipping _dumps.
+        data = self._default_copy(filename, default_data)
+        with self._file_locks.setdefault(filename, threading.Lock()):
             try:
-                file_path.rename(backup_path)
-                self.logger.info(f"Backed up corrupted config to: {backup_path}")
-            except (IOError, OSError) as e_rename:
-                self.logger.error(f"Failed to rename corrupted config {filename}: {e_rename}")
-            return default_data
-        except (IOError, OSError) as e:
-            self.logger.error(f"Failed to load {filename}: {e}")
-            return default_data
-        except Exception as e:
-            self.logger.error(f"Unexpected error loading {filename}: {e}")
-            return default_data
+                self._write_file(filename, _DEFAULT_BYTES[filename], data)
+            except (IOError, OSError) as e:
+                self.logger.error(f"Failed to create default config for {filename}: {e}")
+                return {} # Return empty if creation fails
+        return data
+
+    def _default_copy(self, filename: str, default_data: Dict) -> Dict:
+        """Returns a private copy of a built-in default; other defaults as-is."""
+        if default_data is _DEFAULTS.get(filename):
+            return json_io.loads(_DEFAULT_BYTES[filename])
+        return default_data
+
+    def _write_file(self, filename: str, raw: bytes, data: Dict):
+        """Atomically replaces the file with raw and records it. Caller holds the file lock."""
+        file_path = self.config_dir / filename
+        tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+        try:
+            tmp_path.write_bytes(raw)
+            tmp_path.replace(file_path)
+        except BaseException:
+            # The original file is untouched; don't leave a partial temp file behind.
+            tmp_path.unlink(missing_ok=True)
+            raise
+        st = file_path.stat()
+        self._mtime_cache[filename] = (st.st_mtime_ns, st.st_size, data)
+        self._last_written[filename] = raw
+
+    def _stat_key(self, filename: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of the file, or None if it can't be stat'ed (e.g. missing)."""
+        try:
+            st = (self.config_dir / filename).stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _is_stale(self, filename: str) -> bool:
+        """True if the file was modified on disk since we last read or wrote it."""
+        cached = self._mtime_cache.get(filename)
+        if cached is None:
+            return False
+        key = self._stat_key(filename)
+        return key is not None and key != cached[:2]
+
+    def has_changed_on_disk(self, filename: str) -> bool:
+        """
+        True if the file was modified outside this loader since it was last
+        read or written through it; saves made with save_config don't count.
+        """
+        # Waits out a save of the same file in progress on another thread.
+        with self._file_locks.setdefault(filename, threading.Lock()):
+            return self._is_stale(filename)
+
+    def reload_if_changed(self, filename: str) -> bool:
+        """
+        Re-reads a cached config if has_changed_on_disk says it was edited
+        outside this loader. Returns True if it was reloaded; the new dict
+        replaces the cached one, so callers should fetch it again.
+        """
+        if filename not in self.configs or not self.has_changed_on_disk(filename):
+            return False
+        self.logger.info(f"Config '{filename}' changed on disk. Reloading.")
+        self.configs[filename] = self._load_config(filename, self._defaults.get(filename, {}))
+        return True
 
     def get_config(self, filename: str) -> Dict:
-        """Gets a specific loaded config."""
+        """
+        Gets a specific config. Configs not loaded at startup are read on
+        first access and cached; after that this is a plain cache lookup
+        (see reload_if_changed to pick up edits made outside the app).
+        """
         if filename not in self.configs:
-            # If a config is requested that wasn't in defaults and didn't exist at startup
-            self.logger.warning(f"Config '{filename}' was not loaded at startup. Returning empty.")
-        return self.configs.get(filename, {})
+            # Only defaults are created when missing; _load_config's own stat
+            # is the existence check for everything else.
+            data = self._load_config(filename, self._defaults.get(filename, {}), create_missing=filename in self._defaults)
+            if data is None:
+                # A config that wasn't in defaults and doesn't exist on disk
+                self.logger.warning(f"Config '{filename}' was not loaded at startup. Returning empty.")
+                data = {}
+            self.configs[filename] = data
+        return self.configs[filename]
 
     def save_config(self, filename: str, data: Dict):
-        """Saves data to a specific config file."""
-        file_path = self.config_dir / filename
-        self.configs[filename] = data
-        try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
-        except (IOError, OSError) as e:
-            self.logger.error(f"Failed to save {filename}: {e}")
-            raise ConfigurationError(f"Could not write to file {filename}: {e}") from e
-        except Exception as e:
-            self.logger.error(f"Unexpected error saving {filename}: {e}")
-            raise ConfigurationError(f"Unexpected error saving {filename}: {e}") from e
+        """
+        Saves data to a specific config file. Safe to call from any thread.
+        The write is skipped when the file already holds exactly this data;
+        otherwise it goes to a temp file that is renamed over the original, so
+        a crash mid-write never leaves a truncated config behind.
+        """
+        with self._file_locks.setdefault(filename, threading.Lock()):
+            self.configs[filename] = data
+            try:
+                raw = _dumps(data)
+                # One stat covers both "still exists" and "not edited since".
+                cached = self._mtime_cache.get(filename)
+                if raw == self._last_written.get(filename) and cached is not None and self._stat_key(filename) == cached[:2]:
+                    return
+                self._write_file(filename, raw, data)
+            except (IOError, OSError) as e:
+                self.logger.error(f"Failed to save {filename}: {e}")
+                raise ConfigurationError(f"Could not write to file {filename}: {e}") from e
+            except Exception as e:
+                self.logger.error(f"Unexpected error saving {filename}: {e}")
+                raise ConfigurationError(f"Unexpected error saving {filename}: {e}") from e
+            finally:
+                with self._derived_lock:
+                    for key in [k for k in self._derived if k[0] == filename]:
+                        del self._derived[key]
+
+    def update_in_background(self, filename: str, section: str, key: str, value: Any) -> Future:
+        """
+        Sets config[section][key] = value and saves the file on the loader's
+        writer thread, so callers on the UI thread don't wait on disk. Updates
+        are applied in call order, directly on the cached dict under the
+        file's lock, so they never replace a dict callers hold nor overwrite
+        a newer save. Pending updates still complete when the app exits.
+        """
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ConfigWriter")
+        return self._writer.submit(self._update_key, filename, section, key, value)
+
+    def _update_key(self, filename: str, section: str, key: str, value: Any):
+        """Runs on the writer thread; see update_in_background."""
+        data = self.get_config(filename) # May load the file, which takes the lock itself
+        with self._file_locks.setdefault(filename, threading.Lock()):
+            data = self.configs.get(filename, data)
+            section_data = data.get(section)
+            if section_data is None:
+                section_data = data[section] = {}
+            section_data[key] = value
+            try:
+                raw = _dumps(data)
+                cached = self._mtime_cache.get(filename)
+                if raw == self._last_written.get(filename) and cached is not None and self._stat_key(filename) == cached[:2]:
+                    return
+                self._write_file(filename, raw, data)
+            except Exception as e:
+                # Nobody waits on the returned future, so log rather than raise.
+                self.logger.error(f"Failed to save {section}.{key} to {filename}: {e}")
+                return
+        with self._derived_lock:
+            for derived_key in [k for k in self._derived if k[0] == filename]:
+                del self._derived[derived_key]
+
+    def save_many(self, updates: Dict[str, Dict]):
+        """
+        Saves several config files in one call, writing them concurrently.
+        Each file is replaced atomically (see save_config). Raises ConfigurationError if any write fails.
+        """
+        if not updates:
+            return
+        with ThreadPoolExecutor(max_workers=len(updates)) as executor:
+            list(executor.map(lambda item: self.save_config(*item), updates.items()))
+
+    def snapshot(self) -> SimpleNamespace:
+        """
+        Returns the ui, models and system configs as attributes of one object,
+        so callers that need all three fetch them in a single call.
+        """
+        return SimpleNamespace(
+            ui=self.get_config("ui_config.json"),
+            models=self.get_config("models_config.json"),
+            system=self.get_config("system_config.json"),
+        )
+
+    def get_event_priorities(self) -> Mapping[str, int]:
+        """Read-only event_type -> priority table from system_config.json."""
+        return self._derived_value("system_config.json", "event_priorities", _frozen_section)
+
+    def get_hotkeys(self) -> Mapping[str, str]:
+        """Read-only action -> hotkey table from system_config.json."""
+        return self._derived_value("system_config.json", "hotkeys", _frozen_section)
+
+    def iter_all_models(self) -> Iterator[Tuple[str, str]]:
+        """Yields (provider_id, model_name) for every configured model, in config order."""
+        return iter(self._derived_value("models_config.json", "all_models", _flatten_models))
+
+    def _derived_value(self, filename: str, name: str, build: Callable[[Dict, str], Any]) -> Any:
+        """
+        Returns build(config, name), built once and rebuilt only after the
+        config is saved or reloaded from disk.
+        """
+        config = self.get_config(filename)
+        with self._derived_lock:
+            cached = self._derived.get((filename, name))
+            if cached is not None and cached[0] is config:
+                return cached[1]
+            value = build(config, name)
+            self._derived[(filename, name)] = (config, value)
+            return value
 
     def get_data_dir(self) -> Path:
         """Returns the root directory for all app data."""
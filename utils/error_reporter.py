@@ -1,13 +1,13 @@
 # file: utils/error_reporter.py
 
 import abc
-import aiofiles
 import asyncio
 import json
 import datetime
 import logging
 from pathlib import Path
-from typing import Dict, Any, Protocol
+from typing import Dict, Any, Optional, Protocol, Set
+from utils import json_io
 
 # Get a logger for this module
 logger = logging.getLogger(__name__)
@@ -28,50 +28,138 @@ class BaseErrorReporter(abc.ABC):
         """
         pass
 
+    async def close(self):
+        """Flushes any buffered reports. Reporters that write immediately need not override."""
+        pass
+
 class JsonFileErrorReporter(BaseErrorReporter):
     """
     An error reporter that writes issue details to a JSON file.
     
     This implementation will create/update a JSON file for each unique
-    error pattern hash.
+    error pattern hash, at <output_dir>/<first two hash chars>/<hash>.json.
+    Reports are aggregated in memory and merged into the files at most once
+    per flush interval, so a burst of reports for the same pattern costs
+    one read-modify-write instead of one per report.
     """
-    def __init__(self, output_dir: Path):
+    FLUSH_INTERVAL_SECONDS = 1.0
+
+    def __init__(self, output_dir: Path, flush_interval: float = FLUSH_INTERVAL_SECONDS):
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self._lock = asyncio.Lock() # Lock for file I/O operations
+        self.flush_interval = flush_interval
+        self._lock = asyncio.Lock() # Guards _pending
+        self._io_lock = asyncio.Lock() # Serializes flushes (file I/O)
+        # pattern_hash -> updates not yet merged into its report file
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # pattern_hash -> report as last written. This reporter is the only
+        # writer of its files, so a cached report is never stale.
+        self._report_cache: Dict[str, Dict[str, Any]] = {}
+        # Hash prefixes whose subdirectory is known to exist.
+        self._prefix_dirs: Set[str] = set()
 
     async def report_issue(self, pattern_hash: str, error_details: Dict[str, Any]):
         """
-        Writes the error report to a file named <pattern_hash>.json.
-        If the file already exists, it updates the count and last_updated timestamp.
+        Records the report in memory and schedules a flush. On flush, the
+        report is merged into its <pattern_hash>.json: the count is added to the
+        total and last_reported/last_report_details are updated.
         """
-        report_file = self.output_dir / f"{pattern_hash}.json"
         now_iso = datetime.datetime.utcnow().isoformat()
         
         async with self._lock:
-            report_data = {}
-            if report_file.exists():
-                try:
-                    async with aiofiles.open(report_file, 'r', encoding='utf-8') as f:
-                        report_data = json.loads(await f.read())
-                except (IOError, json.JSONDecodeError) as e:
-                    logger.warning(f"Could not read existing error report {report_file}: {e}. Overwriting.")
-                    report_data = {}
+            pending = self._pending.get(pattern_hash)
+            if pending is None:
+                pending = self._pending[pattern_hash] = {"first_reported_utc": now_iso, "occurrences": 0}
+            pending["last_reported_utc"] = now_iso
+            pending["occurrences"] += error_details.get("count_in_timespan", 1)
+            pending["last_report_details"] = error_details
             
-            # Update data
-            report_data["pattern_hash"] = pattern_hash
-            report_data.setdefault("first_reported_utc", now_iso)
-            report_data["last_reported_utc"] = now_iso
-            report_data["total_occurrences"] = report_data.get("total_occurrences", 0) + error_details.get("count_in_timespan", 1)
-            report_data["last_report_details"] = error_details
-            
-            # Write data back to file
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        """Writes every pending report to disk now."""
+        async with self._io_lock:
+            async with self._lock:
+                pending, self._pending = self._pending, {}
+                # Reports arriving from here on belong to the next flush, so
+                # the timer must not count as scheduled while this one writes.
+                if self._flush_task is asyncio.current_task():
+                    self._flush_task = None
+            for pattern_hash, update in pending.items():
+                # One bad report (e.g. unserializable details) must not cost
+                # the rest of the batch, which has already left _pending.
+                try:
+                    await self._write_report(pattern_hash, update)
+                except Exception as e:
+                    logger.error(f"Failed to write error report {pattern_hash}: {e}", exc_info=True)
+
+    async def close(self):
+        """Flushes pending reports and stops the flush timer; call on shutdown."""
+        await self.flush()
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+
+    async def _write_report(self, pattern_hash: str, update: Dict[str, Any]):
+        # Sharded by hash prefix (like git's objects/) so no single directory
+        # grows to tens of thousands of entries.
+        prefix = pattern_hash[:2]
+        report_file = self.output_dir / prefix / f"{pattern_hash}.json"
+        if prefix not in self._prefix_dirs:
+            report_file.parent.mkdir(parents=True, exist_ok=True)
+            self._prefix_dirs.add(prefix)
+        
+        report_data = {}
+        cached = self._report_cache.get(pattern_hash)
+        if cached is not None:
+            # Copied so a failed write leaves the cache matching the file.
+            report_data = dict(cached)
+        elif report_file.exists() or await self._adopt_legacy_report(pattern_hash, report_file):
             try:
-                async with aiofiles.open(report_file, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(report_data, indent=2))
-                logger.info(f"Error report written/updated: {report_file}")
-            except IOError as e:
-                logger.error(f"Failed to write error report to {report_file}: {e}")
+                report_data = json_io.loads(await asyncio.to_thread(report_file.read_bytes))
+            except (IOError, json.JSONDecodeError) as e:
+                logger.warning(f"Could not read existing error report {report_file}: {e}. Overwriting.")
+                report_data = {}
+        
+        # Update data
+        report_data["pattern_hash"] = pattern_hash
+        report_data.setdefault("first_reported_utc", update["first_reported_utc"])
+        report_data["last_reported_utc"] = update["last_reported_utc"]
+        report_data["total_occurrences"] = report_data.get("total_occurrences", 0) + update["occurrences"]
+        report_data["last_report_details"] = update["last_report_details"]
+        
+        # Write data back to file
+        try:
+            # One thread hop for the whole (small) report. Non-ASCII text is
+            # written unescaped, with or without orjson installed (orjson
+            # can't escape it), unlike the json.dump reports of older versions;
+            # both forms parse to the same data.
+            raw = json_io.dumps(report_data, ensure_ascii=False)
+            await asyncio.to_thread(report_file.write_bytes, raw)
+            self._report_cache[pattern_hash] = report_data
+            logger.info(f"Error report written/updated: {report_file}")
+        except IOError as e:
+            logger.error(f"Failed to write error report to {report_file}: {e}")
+
+    async def _adopt_legacy_report(self, pattern_hash: str, report_file: Path) -> bool:
+        """
+        Moves a report written before reports were sharded
+        (<output_dir>/<hash>.json) into its shard. Returns True if one was moved.
+        """
+        legacy_file = self.output_dir / f"{pattern_hash}.json"
+        if not legacy_file.exists():
+            return False
+        try:
+            await asyncio.to_thread(legacy_file.replace, report_file)
+        except OSError as e:
+            logger.warning(f"Could not move legacy error report {legacy_file}: {e}")
+            return False
+        return True
 
 # Type alias for the ConfigLoader
 class ConfigLoader(Protocol):
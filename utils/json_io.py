@@ -0,0 +1,31 @@
+# file: utils/json_io.py
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(data: Any, indent: int = 2, ensure_ascii: bool = False) -> bytes:
+    """
+    Serializes data to UTF-8 JSON bytes. orjson is used only when it is
+    installed, indent is 2 (the only indent it supports) and ensure_ascii is
+    False (orjson never escapes non-ASCII); any other combination, such as
+    the indent=4 config layout, always goes through stdlib json.
+    """
+    if orjson is not None and indent == 2 and not ensure_ascii:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=indent, ensure_ascii=ensure_ascii).encode("utf-8")
+
+
+def loads(raw: bytes) -> Any:
+    """
+    Parses JSON bytes. orjson.JSONDecodeError subclasses json.JSONDecodeError,
+    so callers catch json.JSONDecodeError either way.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
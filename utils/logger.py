@@ -3,21 +3,31 @@
 import logging
 import sys
 import os
+import time
 import psutil
+import queue
 import asyncio
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Optional, Protocol
+from typing import Optional, Protocol, Set
 from core.error_analytics import ErrorAnalytics 
 
 # --- ADDED: AnalyticsLogHandler ---
 class AnalyticsLogHandler(logging.Handler):
     """
     A logging handler that forwards error records to the ErrorAnalytics service.
+    Records can be logged from any thread; analysis is scheduled on the app's
+    event loop (see set_analytics_loop), and records are dropped while
+    MAX_PENDING analyses are already in flight.
     """
-    def __init__(self, analytics: ErrorAnalytics, level=logging.ERROR):
+    MAX_PENDING = 100
+
+    def __init__(self, analytics: ErrorAnalytics, loop: Optional[asyncio.AbstractEventLoop] = None, level=logging.ERROR):
         super().__init__(level=level)
         self.analytics = analytics
+        self.loop = loop
+        self._pending = threading.BoundedSemaphore(self.MAX_PENDING)
 
     def emit(self, record: logging.LogRecord):
         """
@@ -34,24 +44,48 @@ class AnalyticsLogHandler(logging.Handler):
                 else:
                     return 
             
+            loop = self.loop
+            if loop is None or loop.is_closed():
+                print(f"WARNING: Could not submit error to analytics. No running event loop. Error: {error}", file=sys.stderr)
+                return
+            if not self._pending.acquire(blocking=False):
+                return # Error storm; analytics is already behind
+            
             context = {
                 "log_message": record.getMessage(),
                 "module": record.module,
                 "funcName": record.funcName,
                 "lineno": record.lineno,
             }
-            
+            if not isinstance(error, Exception):
+                error = Exception(f"{type(error).__name__}: {error}")
+            coro = self.analytics.analyze_error(error, context)
             try:
-                loop = asyncio.get_running_loop()
-                if loop.is_running():
-                    if not isinstance(error, Exception):
-                        error = Exception(f"{type(error).__name__}: {error}")
-                    asyncio.create_task(self.analytics.analyze_error(error, context))
-            except RuntimeError:
-                print(f"WARNING: Could not submit error to analytics. No running event loop. Error: {error}", file=sys.stderr)
+                future = asyncio.run_coroutine_threadsafe(coro, loop)
+            except Exception:
+                # e.g. the loop closed after the check above, during shutdown
+                coro.close()
+                self._pending.release()
+                self.handleError(record)
+                return
+            future.add_done_callback(lambda _: self._pending.release())
 # --- END ADDED SECTION ---
 
 
+_LOG_FMT = "%(asctime)s - %(name)s - %(levelname)s - [%(mem_rss_mb)4.1fMB] - %(message)s (%(filename)s:%(lineno)d)"
+# Shared by the app's handlers and built once, not per setup_logging() call.
+_LOG_FORMATTER = logging.Formatter(_LOG_FMT)
+# For handlers behind the queue, whose records arrive already formatted.
+_PREFORMATTED = logging.Formatter("%(message)s")
+
+# Names of the handlers setup_logging() has installed on the root logger;
+# checked instead of scanning logger.handlers. Cleared by reset_logging().
+_INSTALLED: Set[str] = set()
+
+# Owns the file handler; see setup_logging() and stop_logging().
+_listener: Optional[QueueListener] = None
+
+
 # --- MODIFIED: Protocol for ConfigLoader ---
 # This provides type hints for the config_loader dependency
 class ConfigLoader(Protocol):
@@ -65,26 +99,43 @@ class ConfigLoader(Protocol):
 class MemoryLogFilter(logging.Filter):
     """
     Injects current process memory (RSS) into log records.
+    RSS is sampled at most once per RSS_TTL_SECONDS rather than per record.
     """
+    RSS_TTL_SECONDS = 1.0
+
     def __init__(self):
         super().__init__()
         try:
             self.process = psutil.Process(os.getpid())
         except psutil.NoSuchProcess:
             self.process = None 
+        self._cached_rss_mb = 0.0
+        self._cache_expires_at = 0.0
 
     def filter(self, record):
+        if hasattr(record, "mem_rss_mb"):
+            # Already set by this filter on another handler.
+            return True
         if self.process:
-            try:
-                mem_info = self.process.memory_info()
-                record.mem_rss_mb = mem_info.rss / (1024 * 1024)
-            except psutil.Error:
-                record.mem_rss_mb = 0.0
+            now = time.monotonic()
+            if now >= self._cache_expires_at:
+                try:
+                    self._cached_rss_mb = self.process.memory_info().rss / (1024 * 1024)
+                except psutil.Error:
+                    self._cached_rss_mb = 0.0
+                self._cache_expires_at = now + self.RSS_TTL_SECONDS
+            record.mem_rss_mb = self._cached_rss_mb
         else:
             record.mem_rss_mb = 0.0
         return True
 
 
+def _add_memory_filter(handler: logging.Handler, memory_filter: MemoryLogFilter, log_format: str):
+    """Attaches memory_filter only if log_format, the handler's format, prints %(mem_rss_mb)."""
+    if "%(mem_rss_mb)" in log_format:
+        handler.addFilter(memory_filter)
+
+
 # --- MODIFIED: Function signature ---
 def setup_logging(config_loader: ConfigLoader, analytics_service: Optional[ErrorAnalytics] = None):
 # --- END MODIFIED SECTION ---
@@ -100,46 +151,114 @@ def setup_logging(config_loader: ConfigLoader, analytics_service: Optional[Error
     log_dir.mkdir(parents=True, exist_ok=True)
     log_file = log_dir / "agent.log"
     
-    log_format = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - [%(mem_rss_mb)4.1fMB] - %(message)s (%(filename)s:%(lineno)d)"
-    )
-    
     logger = logging.getLogger()
     logger.setLevel(log_level)
     
+    # Handler filters only run for records that pass the logger and handler
+    # levels, so RSS is never sampled for filtered-out records.
     memory_filter = MemoryLogFilter()
     
     # --- Console Handler ---
-    if not any(h.get_name() == "app_console_handler" for h in logger.handlers):
+    if "app_console_handler" not in _INSTALLED:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.set_name("app_console_handler")
         console_handler.setLevel(log_level)
-        console_handler.setFormatter(log_format)
-        console_handler.addFilter(memory_filter) 
+        console_handler.setFormatter(_LOG_FORMATTER)
+        _add_memory_filter(console_handler, memory_filter, _LOG_FMT)
         logger.addHandler(console_handler)
+        _INSTALLED.add("app_console_handler")
     
-    # --- Rotating File Handler ---
-    if not any(h.get_name() == "app_file_handler" for h in logger.handlers):
+    # --- Rotating File Handler (behind a queue) ---
+    # Callers, including the asyncio loop thread, only enqueue the record;
+    # the listener thread does the file write and any rollover.
+    global _listener
+    if "app_queue_handler" not in _INSTALLED:
         file_handler = RotatingFileHandler(
             log_file, maxBytes=5*1024*1024, backupCount=5, encoding='utf-8'
         )
         file_handler.set_name("app_file_handler")
         file_handler.setLevel(log_level)
-        file_handler.setFormatter(log_format)
-        file_handler.addFilter(memory_filter) 
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(_PREFORMATTED)
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.set_name("app_queue_handler")
+        queue_handler.setLevel(log_level)
+        # QueueHandler.prepare() formats the record before queueing it and
+        # folds any traceback into the message, so the full app format is
+        # applied there; the file handler just writes the result.
+        queue_handler.setFormatter(_LOG_FORMATTER)
+        _add_memory_filter(queue_handler, memory_filter, _LOG_FMT)
+        logger.addHandler(queue_handler)
+        _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        _INSTALLED.add("app_queue_handler")
 
     logging.info("--- Logging initialized ---")
     logging.info(f"Log level set to: {log_level_str}")
     logging.info(f"Log files at: {log_file}")
 
     # --- ADDED: Error Analytics Handler ---
-    if analytics_service and not any(isinstance(h, AnalyticsLogHandler) for h in logger.handlers):
+    # Attached directly, not behind the queue: QueueHandler drops exc_info,
+    # which this handler needs.
+    if analytics_service and "app_analytics_handler" not in _INSTALLED:
         analytics_config = config_loader.get_config("error_analytics_config.json")
         if analytics_config.get("enabled", False): 
             analytics_handler = AnalyticsLogHandler(analytics_service, level=logging.ERROR)
+            analytics_handler.set_name("app_analytics_handler")
             logger.addHandler(analytics_handler)
+            _INSTALLED.add("app_analytics_handler")
             logging.info("Error analytics handler initialized.")
     # --- END ADDED SECTION ---
 
-    
\ No newline at end of file
+
+def stop_logging():
+    """
+    Flushes queued records to the log file and stops the listener thread.
+    The file handler is then attached directly, so anything logged
+    afterwards (e.g. during restart) still reaches the file.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logger = logging.getLogger()
+    queue_handlers = [h for h in logger.handlers if h.get_name() == "app_queue_handler"]
+    for handler in queue_handlers:
+        logger.removeHandler(handler)
+    # "app_queue_handler" stays in _INSTALLED: the file handler it fed is
+    # still installed, and a later setup_logging() must not add another.
+    for handler in _listener.handlers:
+        # Records now reach the handler unformatted; give it the queue
+        # handler's format and filters.
+        for queue_handler in queue_handlers:
+            handler.setFormatter(queue_handler.formatter)
+            for log_filter in queue_handler.filters:
+                handler.addFilter(log_filter)
+        logger.addHandler(handler)
+        _INSTALLED.add(handler.get_name())
+    _listener = None
+
+
+def reset_logging():
+    """
+    Removes and closes every handler setup_logging() installed, so the next
+    call installs them afresh. Meant for tests.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    logger = logging.getLogger()
+    for handler in [h for h in logger.handlers if h.get_name() in _INSTALLED]:
+        logger.removeHandler(handler)
+        handler.close()
+    _INSTALLED.clear()
+
+
+def set_analytics_loop(loop: asyncio.AbstractEventLoop):
+    """Points the analytics handler at the app's event loop once it is running."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, AnalyticsLogHandler):
+            handler.loop = loop